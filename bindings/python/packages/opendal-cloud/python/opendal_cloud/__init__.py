@@ -25,6 +25,36 @@ Provides access to extended cloud storage services including:
 - Developer platforms: Hugging Face, Supabase, LakeFS
 """
 
-from ._opendal_cloud import *
+import importlib
 
-__all__ = _opendal_cloud.__all__
+__all__ = [
+    "Operator",
+    "AsyncOperator",
+    "File",
+    "AsyncFile",
+    "Entry",
+    "EntryMode",
+    "Metadata",
+    "PresignedRequest",
+    "Capability",
+    "WriteOptions",
+    "ReadOptions",
+    "ListOptions",
+    "StatOptions",
+    "layers",
+    "exceptions",
+]
+
+
+def __getattr__(name):
+    # Resolve public names against the compiled extension on first access only,
+    # then cache them in the module namespace so later lookups bypass this hook.
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module("._opendal_cloud", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
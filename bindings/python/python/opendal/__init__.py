@@ -22,19 +22,33 @@ This package automatically routes operations to the appropriate service package
 based on the storage scheme being used.
 """
 
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import os
 import sys
-from typing import Any, Dict, Set, TYPE_CHECKING
+from types import MappingProxyType
 
+# Static-analysis-only imports; typing.TYPE_CHECKING is not imported so that
+# `import opendal` does not pull in the typing module.
+TYPE_CHECKING = False
 if TYPE_CHECKING:
-    from opendal_core import Operator as CoreOperator, AsyncOperator as CoreAsyncOperator
+    from collections.abc import Mapping
+    from importlib.machinery import ModuleSpec
+    from types import ModuleType
+
+    from opendal_core import AsyncOperator as CoreAsyncOperator
+    from opendal_core import Operator as CoreOperator
 
-# Service routing configuration
-CORE_SERVICES: Set[str] = {
+# Service routing configuration. Scheme names are interned so membership tests
+# against literal scheme strings mostly reduce to pointer comparisons.
+CORE_SERVICES: frozenset[str] = frozenset(map(sys.intern, (
     "azblob", "azdls", "cos", "fs", "gcs", "ghac", "http", "ipmfs", 
     "memory", "obs", "oss", "s3", "webdav", "webhdfs"
-}
+)))
 
-DATABASE_SERVICES: Set[str] = {
+DATABASE_SERVICES: frozenset[str] = frozenset(map(sys.intern, (
     # SQL Databases (verified from backup)
     "mysql", "postgresql", "sqlite",
     # NoSQL Databases (verified from backup)
@@ -44,9 +58,9 @@ DATABASE_SERVICES: Set[str] = {
     # Local Storage Engines (verified from backup)
     "sled", "redb", "persy"
     # Note: etcd, foundationdb, tikv, rocksdb excluded due to build issues
-}
+)))
 
-CLOUD_SERVICES: Set[str] = {
+CLOUD_SERVICES: frozenset[str] = frozenset(map(sys.intern, (
     # Personal Cloud Storage (verified from backup)
     "aliyun-drive", "dropbox", "onedrive", "gdrive", "yandex-disk",
     # Object Storage (verified from backup)
@@ -57,102 +71,207 @@ CLOUD_SERVICES: Set[str] = {
     "ipfs", "koofr", "moka", "dashmap",
     # Misc (verified from backup)
     "vercel-artifacts", "alluxio"
-}
+)))
 
-ADVANCED_SERVICES: Set[str] = {
+ADVANCED_SERVICES: frozenset[str] = frozenset(map(sys.intern, (
     # File System Extensions (verified from backup)
     "azfile", "monoiofs",
     # Cache Systems (verified from backup)
     "mini-moka", "cacache"
     # Note: ftp, hdfs, sftp excluded due to build/platform issues
+)))
+
+# Every known scheme mapped to the package that provides it, built once at import
+# and exposed read-only.
+_SERVICE_PACKAGE_MAP: Mapping[str, str] = MappingProxyType({
+    **{scheme: "opendal_core" for scheme in CORE_SERVICES},
+    **{scheme: "opendal_database" for scheme in DATABASE_SERVICES},
+    **{scheme: "opendal_cloud" for scheme in CLOUD_SERVICES},
+    **{scheme: "opendal_advanced" for scheme in ADVANCED_SERVICES},
+})
+
+# Unknown schemes are routed to core, which reports unsupported ones itself
+_DEFAULT_PACKAGE = "opendal_core"
+
+# Which service packages are installed, probed once at import so routing to a
+# missing extra never has to walk the import finders again.
+_PKG_SPECS: dict[str, ModuleSpec | None] = {
+    name: importlib.util.find_spec(name)
+    for name in ("opendal_core", "opendal_database", "opendal_cloud", "opendal_advanced")
+}
+_PKG_AVAILABLE: dict[str, bool] = {name: spec is not None for name, spec in _PKG_SPECS.items()}
+
+_INSTALL_HINT: dict[str, str] = {
+    # This should never happen as core is always installed
+    "opendal_core": "OpenDAL core package not found. Please reinstall: pip install opendal",
+    "opendal_database": "Database services not installed. Install with: pip install opendal[database]",
+    "opendal_cloud": "Cloud services not installed. Install with: pip install opendal[cloud]",
+    "opendal_advanced": "Advanced services not installed. Install with: pip install opendal[advanced]",
 }
 
 def _get_service_package(scheme: str) -> str:
     """Determine which package provides the given scheme."""
-    if scheme in CORE_SERVICES:
-        return "opendal_core"
-    elif scheme in DATABASE_SERVICES:
-        return "opendal_database" 
-    elif scheme in CLOUD_SERVICES:
-        return "opendal_cloud"
-    elif scheme in ADVANCED_SERVICES:
-        return "opendal_advanced"
-    else:
-        # Default to core for unknown schemes
-        return "opendal_core"
+    return _SERVICE_PACKAGE_MAP.get(scheme, _DEFAULT_PACKAGE)
+
+def _load_package(package_name: str) -> ModuleType:
+    """Import a service package on first use, with an install hint on failure.
+
+    The module is bound as a global of this package, which is the only cache:
+    later calls and ``opendal.<package>`` lookups find it there.
+    """
+    module = globals().get(package_name)
+    if module is not None:
+        return module
+
+    if not _PKG_AVAILABLE[package_name]:
+        raise ImportError(_INSTALL_HINT[package_name])
+
+    try:
+        module = importlib.import_module(package_name)
+    except ImportError as e:
+        raise ImportError(_INSTALL_HINT[package_name]) from e
+    globals()[package_name] = module
+    return module
+
+def _cached_import(module_name: str, item_name: str):
+    """Fetch an attribute of a service package, importing it only on a miss."""
+    module = _load_package(module_name)
+    try:
+        return getattr(module, item_name)
+    except ImportError as e:
+        # The package loads its native extension on first attribute access
+        raise ImportError(_INSTALL_HINT[module_name]) from e
 
 def _import_operator(scheme: str):
     """Import the appropriate Operator class for the given scheme."""
     package_name = _get_service_package(scheme)
-    
-    try:
-        if package_name == "opendal_core":
-            from opendal_core import Operator, AsyncOperator
-        elif package_name == "opendal_database":
-            from opendal_database import Operator, AsyncOperator
-        elif package_name == "opendal_cloud":
-            from opendal_cloud import Operator, AsyncOperator
-        elif package_name == "opendal_advanced":
-            from opendal_advanced import Operator, AsyncOperator
-        else:
-            raise ImportError(f"Unknown package: {package_name}")
-            
-        return Operator, AsyncOperator
-        
-    except ImportError as e:
-        # Provide helpful installation instructions
-        if package_name == "opendal_core":
-            # This should never happen as core is always installed
-            raise ImportError(f"OpenDAL core package not found. Please reinstall: pip install opendal")
-        elif package_name == "opendal_database":
-            raise ImportError(f"Database services not installed. Install with: pip install opendal[database]")
-        elif package_name == "opendal_cloud":
-            raise ImportError(f"Cloud services not installed. Install with: pip install opendal[cloud]")  
-        elif package_name == "opendal_advanced":
-            raise ImportError(f"Advanced services not installed. Install with: pip install opendal[advanced]")
-        else:
-            raise e
-
-class Operator:
-    """Smart routing Operator that delegates to the appropriate service package."""
-    
-    def __new__(cls, scheme: str, **options: Any):
-        """Create operator instance from the appropriate service package."""
-        OperatorClass, _ = _import_operator(scheme)
-        return OperatorClass(scheme, **options)
-
-class AsyncOperator:
-    """Smart routing AsyncOperator that delegates to the appropriate service package."""
-    
-    def __new__(cls, scheme: str, **options: Any):
-        """Create async operator instance from the appropriate service package."""
-        _, AsyncOperatorClass = _import_operator(scheme)
-        return AsyncOperatorClass(scheme, **options)
-
-# Import shared types and exceptions from core package
-try:
-    from opendal_core import (
-        File, AsyncFile, Entry, EntryMode, Metadata, PresignedRequest, Capability,
-        WriteOptions, ReadOptions, ListOptions, StatOptions
+    return (
+        _cached_import(package_name, "Operator"),
+        _cached_import(package_name, "AsyncOperator"),
+    )
+
+def _preload_packages() -> None:
+    """Register every installed service package in sys.modules and bind it here.
+
+    The specs found at import time are executed directly, so later routing never
+    goes back to the path finders. Package ``__init__`` modules only bind names
+    lazily, so this does not load any native extension.
+    """
+    for name, spec in _PKG_SPECS.items():
+        if spec is None:
+            continue
+        module = sys.modules.get(name)
+        if module is None:
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[name] = module
+            try:
+                spec.loader.exec_module(module)
+            except ImportError:
+                # Leave it to _import_operator to report the failure on use
+                del sys.modules[name]
+                continue
+        globals()[name] = module
+
+# Core schemes that skip the routing lookup once the core operators are bound.
+# Override with a comma-separated OPENDAL_HOT_SCHEMES; non-core schemes are ignored.
+_HOT_CORE: frozenset[str] = frozenset(
+    sys.intern(scheme)
+    for scheme in map(
+        str.strip,
+        os.environ.get("OPENDAL_HOT_SCHEMES", "s3,fs,memory,azblob,gcs").split(","),
     )
-    # Import submodules and make them available as opendal.exceptions and opendal.layers
-    from opendal_core import exceptions as _exceptions, layers as _layers
-    
-    # Make submodules accessible via opendal.exceptions and opendal.layers
-    import sys
-    sys.modules['opendal.exceptions'] = _exceptions
-    sys.modules['opendal.layers'] = _layers
-    
-    # Also make them available as attributes
-    exceptions = _exceptions
-    layers = _layers
-    
-except ImportError:
-    raise ImportError("OpenDAL core package not found. Please install: pip install opendal")
+    if scheme
+) & CORE_SERVICES
+
+# opendal_core's (Operator, AsyncOperator), bound on the first hot-scheme call.
+_CORE_OP: type | None = None
+_CORE_ASYNCOP: type | None = None
+
+def _bind_core(scheme: str) -> tuple[type, type]:
+    """Resolve the scheme, binding the core fast path if it is a hot one."""
+    global _CORE_OP, _CORE_ASYNCOP
+    operators = _import_operator(scheme)
+    if scheme in _HOT_CORE:
+        _CORE_OP, _CORE_ASYNCOP = operators
+    return operators
+
+def Operator(scheme: str, **options) -> CoreOperator:
+    """Create an Operator from the service package that provides the scheme."""
+    op = _CORE_OP
+    if op is not None and scheme in _HOT_CORE:
+        return op(scheme, **options)
+    return _bind_core(scheme)[0](scheme, **options)
+
+def AsyncOperator(scheme: str, **options) -> CoreAsyncOperator:
+    """Create an AsyncOperator from the service package that provides the scheme."""
+    op = _CORE_ASYNCOP
+    if op is not None and scheme in _HOT_CORE:
+        return op(scheme, **options)
+    return _bind_core(scheme)[1](scheme, **options)
+
+def preload_all() -> None:
+    """Load the native extension of every installed service package.
+
+    Opt-in for long-running processes that would rather pay the import cost
+    up front than on first use of each service. ``opendal_core`` is loaded on
+    the calling thread first; the remaining packages are loaded in parallel.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def load(name: str) -> None:
+        importlib.import_module(f"{name}._{name}")
+
+    if _PKG_AVAILABLE["opendal_core"]:
+        load("opendal_core")
+    names = [n for n, ok in _PKG_AVAILABLE.items() if ok and n != "opendal_core"]
+    if not names:
+        return
+    with ThreadPoolExecutor(max_workers=len(names)) as pool:
+        # list() re-raises the first ImportError from the workers
+        list(pool.map(load, names))
+
+# Shared types and submodules re-exported from the core package. They are
+# resolved on first attribute access so that `import opendal` stays cheap.
+_LAZY_CORE_NAMES = frozenset({
+    "File", "AsyncFile", "Entry", "EntryMode", "Metadata", "PresignedRequest",
+    "Capability", "WriteOptions", "ReadOptions", "ListOptions", "StatOptions",
+    "exceptions", "layers",
+})
+
+def __getattr__(name: str):
+    if name in _PKG_SPECS:
+        # opendal.opendal_<group> imports that service package on first access
+        # and binds it as a global; a missing one must surface as AttributeError
+        # so hasattr() keeps working
+        try:
+            return _load_package(name)
+        except ImportError as e:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r} ({e})") from e
+    if name not in _LAZY_CORE_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+        import opendal_core
+    except ImportError:
+        raise ImportError("OpenDAL core package not found. Please install: pip install opendal")
+
+    value = getattr(opendal_core, name)
+    globals()[name] = value
+    if name in ("exceptions", "layers"):
+        # Make submodules accessible via opendal.exceptions and opendal.layers
+        sys.modules[f"{__name__}.{name}"] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | _LAZY_CORE_NAMES)
+
+# Set OPENDAL_LAZY=1 to skip registering the service packages at import time.
+if os.environ.get("OPENDAL_LAZY") != "1":
+    _preload_packages()
 
 # Export everything that the original opendal package exported
 __all__ = [
     "Operator", "AsyncOperator", "File", "AsyncFile", "Entry", "EntryMode", 
     "Metadata", "PresignedRequest", "Capability", "WriteOptions", "ReadOptions", 
-    "ListOptions", "StatOptions", "exceptions", "layers"
+    "ListOptions", "StatOptions", "exceptions", "layers", "preload_all"
 ]
\ No newline at end of file
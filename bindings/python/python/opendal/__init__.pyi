@@ -32,6 +32,9 @@ from opendal.layers import Layer
 
 PathBuf = Union[str, os.PathLike]
 
+def preload_all() -> None:
+    """Load the native extension of every installed service package."""
+
 @final
 class Operator(_Base):
     """The entry class for all public blocking APIs.
@@ -0,0 +1,450 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Helpers shared by the installation test scripts.
+
+Report output, installed package metadata, directory sizes, virtual environment
+creation and directory cleanup used to be duplicated across the scripts.
+Environment queries are cached per process.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import venv
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import orjson
+
+    def _write_json(obj, path: Path):
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+except ImportError:
+    def _write_json(obj, path: Path):
+        with path.open('w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+def dump_json(obj, path: Path):
+    """Write obj to path atomically, so a crash never leaves a half-written report."""
+    tmp = path.with_name(path.name + ".tmp")
+    _write_json(obj, tmp)
+    os.replace(tmp, path)
+
+
+# The bindings/python directory; the service packages live under its packages/
+BINDING_DIR = Path(__file__).resolve().parents[1]
+
+
+def newest_wheel(dist_dir, prefix: str):
+    """Return the newest wheel in dist_dir whose name starts with prefix.
+
+    Returns None when there is none, including when dist_dir does not exist.
+    """
+    try:
+        with os.scandir(dist_dir) as entries:
+            newest = max(
+                (e for e in entries if e.name.startswith(prefix) and e.name.endswith(".whl")),
+                key=lambda e: e.stat().st_mtime,
+                default=None,
+            )
+    except FileNotFoundError:
+        return None
+    return None if newest is None else Path(newest.path)
+
+
+def package_wheel(distribution: str) -> Path:
+    """Return the newest locally built wheel of a distribution such as opendal-core.
+
+    When none is found the glob pattern itself is returned, and callers treat it
+    as a missing path.
+    """
+    if distribution == "opendal":
+        dist_dir = BINDING_DIR / "dist"
+    else:
+        dist_dir = BINDING_DIR / "packages" / distribution / "dist"
+    prefix = f"{distribution.replace('-', '_')}-"
+    wheel = newest_wheel(dist_dir, prefix)
+    if wheel is None:
+        return dist_dir / f"{prefix}*.whl"
+    return wheel
+
+
+# Report output directory, overridable with OPENDAL_TEST_REPORT_DIR (e.g. /dev/shm)
+REPORT_DIR = Path(os.environ.get("OPENDAL_TEST_REPORT_DIR", tempfile.gettempdir()))
+
+
+def _temp_root():
+    """Parent directory for test environments.
+
+    OPENDAL_TEST_TMPDIR if set, otherwise /dev/shm when it has at least 1 GiB
+    free (containers often cap it at 64 MB), otherwise the system default.
+    """
+    configured = os.environ.get("OPENDAL_TEST_TMPDIR")
+    if configured:
+        return configured
+    shm_dir = "/dev/shm"
+    try:
+        if os.access(shm_dir, os.W_OK) and shutil.disk_usage(shm_dir).free >= 1 << 30:
+            return shm_dir
+    except OSError:
+        pass
+    return None
+
+
+# None means the system default temporary directory
+TEMP_ROOT = _temp_root()
+
+# Environment for pip in the test environments: one shared cache directory
+# (overridable with PIP_CACHE_DIR), no version check and no prompts
+PIP_ENV = {
+    **os.environ,
+    "PIP_CACHE_DIR": os.environ.get(
+        "PIP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "opendal_pip_cache")
+    ),
+    "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+    "PIP_NO_INPUT": "1",
+}
+
+# Cache directory for template virtual environments, overridable with
+# OPENDAL_TEST_VENV_CACHE
+VENV_CACHE_DIR = Path(os.environ.get(
+    "OPENDAL_TEST_VENV_CACHE", Path.home() / ".cache" / "opendal_test_venv"
+))
+
+
+@functools.lru_cache(maxsize=None)
+def get_installed_opendal_packages():
+    """Return {normalized name: Distribution} for the installed opendal packages."""
+    from importlib.metadata import distributions
+
+    installed = {}
+    for dist in distributions():
+        name = (dist.metadata["Name"] or "").lower().replace('-', '_')
+        if "opendal" in name:
+            installed[name] = dist
+    return installed
+
+
+def installed_distributions(python_path) -> set:
+    """Return the distribution names installed in the target environment.
+
+    Names are lowercase and dash-separated. They are read with the target
+    interpreter's importlib.metadata rather than by running pip.
+    """
+    script = (
+        "import json\n"
+        "from importlib.metadata import distributions\n"
+        "print(json.dumps([d.metadata['Name'] or '' for d in distributions()]))\n"
+    )
+    result = subprocess.run([python_path, "-c", script], stdin=subprocess.DEVNULL,
+                            capture_output=True)
+    if result.returncode != 0:
+        return set()
+    return {name.lower().replace('_', '-') for name in json.loads(result.stdout)}
+
+
+# How much of pip's output run_pip reads back on failure; the error is at the end
+PIP_LOG_TAIL_BYTES = 4096
+
+
+def run_pip(cmd) -> subprocess.CompletedProcess:
+    """Run a pip command with PIP_ENV, sending its output to a temporary file.
+
+    On failure, stderr holds the last PIP_LOG_TAIL_BYTES of the combined output,
+    so error messages and reports are not bloated by full build logs.
+    """
+    with tempfile.TemporaryFile(dir=TEMP_ROOT) as log:
+        result = subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=log,
+                                stderr=subprocess.STDOUT, env=PIP_ENV)
+        if result.returncode != 0:
+            size = log.seek(0, os.SEEK_END)
+            log.seek(max(size - PIP_LOG_TAIL_BYTES, 0))
+            tail = log.read().decode(errors="replace")
+            result.stderr = tail if size <= PIP_LOG_TAIL_BYTES else "...\n" + tail
+    return result
+
+
+def run_service_probe(python_path, test_services, cwd=None) -> list:
+    """Run _opendal_service_probe in the target environment with cwd as working dir.
+
+    Returns one {"output", "error"} dict per service. All services are probed
+    by a single child process; if the probe itself fails, every service is
+    reported as failed with its stderr.
+    """
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parent)}
+    result = subprocess.run(
+        [python_path, "-m", "_opendal_service_probe", json.dumps(test_services)],
+        cwd=cwd, stdin=subprocess.DEVNULL, capture_output=True, env=env,
+    )
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        error = result.stderr.decode(errors="replace")
+        return [{"output": "", "error": error}] * len(test_services)
+
+
+def recorded_size(dist, package: str):
+    """Size of the package directory according to the distribution's RECORD.
+
+    Returns None without a RECORD or when it lists no files under the package
+    directory, as with editable installs. Entries without a recorded size (such
+    as RECORD itself) fall back to stat.
+    """
+    files = dist.files
+    if files is None:
+        return None
+    total_size = 0
+    found = False
+    for file in files:
+        if file.parts[0] != package:
+            continue
+        found = True
+        if file.size is not None:
+            total_size += file.size
+        else:
+            try:
+                total_size += os.stat(dist.locate_file(file)).st_size
+            except OSError:
+                pass
+    return total_size if found else None
+
+
+def directory_size(path) -> int:
+    """Total size of the regular files under path, not following symlinks."""
+    total_size = 0
+    stack = [os.fspath(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return total_size
+
+
+def remove_tree(path) -> None:
+    """Delete a directory tree, unlinking the files from a thread pool.
+
+    Virtual environments hold thousands of files, and deleting them one by one
+    dominated the cleanup time.
+    """
+    files = []
+    dirs = []
+    stack = [os.fspath(path)]
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            files.append(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+    def unlink(file_path):
+        try:
+            os.unlink(file_path)
+        except OSError:
+            pass
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        pool.map(unlink, files)
+
+    # Subdirectories are always listed after their parent, so removing in
+    # reverse order only ever hits empty directories
+    for dir_path in reversed(dirs):
+        try:
+            os.rmdir(dir_path)
+        except OSError:
+            pass
+    # Catch entries created during the walk or that failed to delete
+    shutil.rmtree(path, ignore_errors=True)
+
+
+# Background pool for remove_tree_later, created on first use. Its workers are
+# joined before the interpreter exits, so no removal is lost.
+_TRASH_POOL = None
+
+
+def _reset_trash_pool() -> None:
+    # A forked child inherits the pool object but not its threads
+    global _TRASH_POOL
+    _TRASH_POOL = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_trash_pool)
+
+
+def remove_tree_later(path) -> None:
+    """Rename a directory out of the way and delete it on a background thread.
+
+    Falls back to a synchronous delete when the rename fails, e.g. when the
+    directory no longer exists.
+    """
+    path = os.fspath(path)
+    trash = path + ".trash"
+    try:
+        os.rename(path, trash)
+    except OSError:
+        remove_tree(path)
+        return
+    global _TRASH_POOL
+    if _TRASH_POOL is None:
+        _TRASH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="remove_tree")
+    # The task may only run during interpreter shutdown, when remove_tree can no
+    # longer start its own thread pool
+    _TRASH_POOL.submit(shutil.rmtree, trash, ignore_errors=True)
+
+
+def wait_for_removals() -> None:
+    """Wait for every removal submitted by remove_tree_later to finish."""
+    global _TRASH_POOL
+    if _TRASH_POOL is not None:
+        _TRASH_POOL.shutdown(wait=True)
+        _TRASH_POOL = None
+
+
+def _template_venv() -> Path:
+    """Return the template virtual environment for this interpreter, creating it if needed.
+
+    The template is built in a staging directory and renamed into place, so when
+    several processes race only one of them wins.
+    """
+    tag = hashlib.sha1(f"{sys.executable}|{sys.version}|linked-pip".encode()).hexdigest()[:12]
+    template = VENV_CACHE_DIR / tag
+    if template.is_dir():
+        return template
+
+    VENV_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f"{tag}-", dir=VENV_CACHE_DIR))
+    # Skip ensurepip and link the host interpreter's pip instead; fall back to a
+    # full venv when linking fails
+    venv.EnvBuilder(symlinks=True).create(staging)
+    try:
+        _link_host_pip(staging)
+    except (ImportError, OSError):
+        remove_tree(staging)
+        venv.EnvBuilder(with_pip=True, symlinks=True).create(staging)
+    # Script shebangs point at the staging path until rewritten
+    _rewrite_shebangs(staging, staging, template)
+    try:
+        os.rename(staging, template)
+    except OSError:
+        # Another process created the template first
+        remove_tree(staging)
+    return template
+
+
+_PIP_SHIM = """#!{python}
+import sys
+from pip._internal.cli.main import main
+if __name__ == '__main__':
+    sys.exit(main())
+"""
+
+
+def _link_host_pip(env_dir: Path) -> None:
+    """Symlink the host pip package and its dist-info into env_dir and add pip scripts.
+
+    Cloning an environment then copies two links instead of pip's thousand files.
+    """
+    import pip
+
+    pip_dir = Path(pip.__file__).parent
+    site_packages = next((env_dir / "lib").glob("python*/site-packages"))
+    for source in (pip_dir, *pip_dir.parent.glob("pip-*.dist-info")):
+        os.symlink(source, site_packages / source.name, target_is_directory=True)
+
+    python = env_dir / "bin" / "python"
+    for name in ("pip", "pip3", f"pip{sys.version_info[0]}.{sys.version_info[1]}"):
+        script = env_dir / "bin" / name
+        script.write_text(_PIP_SHIM.format(python=python))
+        script.chmod(0o755)
+
+
+def _rewrite_shebangs(env_dir: Path, old_root: Path, new_root: Path) -> None:
+    """Replace old_root with new_root in the shebangs of the scripts under bin.
+
+    The files may be hardlinked to the template, so new files are written
+    instead of editing in place.
+    """
+    old, new = os.fsencode(old_root), os.fsencode(new_root)
+    for entry in os.scandir(env_dir / "bin"):
+        if not entry.is_file(follow_symlinks=False):
+            continue
+        with open(entry.path, "rb") as f:
+            data = f.read()
+        first_line, sep, rest = data.partition(b"\n")
+        if not first_line.startswith(b"#!") or old not in first_line:
+            continue
+        mode = entry.stat(follow_symlinks=False).st_mode
+        os.unlink(entry.path)
+        with open(entry.path, "wb") as f:
+            f.write(first_line.replace(old, new) + sep + rest)
+        os.chmod(entry.path, mode)
+
+
+def create_venv(env_dir) -> None:
+    """Create a virtual environment in env_dir.
+
+    On POSIX it is cloned from the cached template (hardlinks where possible).
+    On Windows the script launchers embed their path, so it is created directly.
+    """
+    env_dir = Path(env_dir)
+    if sys.platform == "win32":
+        venv.EnvBuilder(with_pip=True).create(env_dir)
+        return
+
+    clone_venv(_template_venv(), env_dir)
+
+
+def clone_venv(source_dir, env_dir) -> None:
+    """Copy the virtual environment in source_dir, installed packages included, to env_dir.
+
+    Not supported on Windows. Files are hardlinked where possible; pip deletes
+    before writing when it replaces or removes a file, so the source stays intact.
+    """
+    source_dir, env_dir = Path(source_dir), Path(env_dir)
+    try:
+        shutil.copytree(source_dir, env_dir, symlinks=True, copy_function=os.link)
+    except (OSError, shutil.Error):
+        # e.g. across file systems, where hardlinks are not possible
+        remove_tree(env_dir)
+        shutil.copytree(source_dir, env_dir, symlinks=True)
+    _rewrite_shebangs(env_dir, source_dir, env_dir)
@@ -0,0 +1,133 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Probe run inside an optional installation test environment.
+
+Usage: python -m _opendal_installation_probe '{"expected_packages": [...], "test_services": [...]}'
+
+Checks package availability, service routing and installation size in one
+process and writes {"packages": ..., "routing": ..., "size": ...} to stdout as
+JSON. A check that itself fails becomes {"error": ...} without affecting the
+others. stdout is redirected to stderr during the checks, so anything printed
+by the imported modules stays out of the JSON result.
+"""
+
+import contextlib
+import importlib
+import json
+import os
+import sys
+from importlib.metadata import distributions
+
+
+def package_availability(expected_packages):
+    results = {}
+
+    try:
+        importlib.import_module("opendal")
+        results["opendal"] = "✅ 成功导入"
+    except Exception as e:
+        results["opendal"] = f"❌ 导入失败: {e}"
+
+    for pkg in expected_packages:
+        try:
+            importlib.import_module(pkg)
+            results[pkg] = "✅ 可用"
+        except ImportError:
+            results[pkg] = "❌ 不可用"
+        except Exception as e:
+            results[pkg] = f"❌ 错误: {e}"
+
+    return results
+
+
+def service_routing(test_services):
+    results = {}
+
+    try:
+        import opendal
+
+        for service_name, expected_result in test_services:
+            try:
+                opendal.Operator(service_name, **{})
+                results[service_name] = "✅ 路由成功"
+            except ImportError as e:
+                if "not installed" in str(e):
+                    results[service_name] = f"⚠️ 预期的导入错误: {e}"
+                else:
+                    results[service_name] = f"❌ 意外的导入错误: {e}"
+            except Exception as e:
+                # A config error means the scheme was routed to a package
+                results[service_name] = f"✅ 路由成功 (配置错误正常): {type(e).__name__}"
+
+        return results
+
+    except Exception as e:
+        return {"error": f"路由测试失败: {e}"}
+
+
+def file_size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def installation_size():
+    results = {}
+    total_size = 0
+
+    # Sum the files recorded by each distribution instead of walking site-packages
+    for dist in distributions():
+        name = (dist.metadata["Name"] or "").lower().replace("-", "_")
+        if not name.startswith("opendal"):
+            continue
+        # Only stat files whose size RECORD does not list
+        size = sum(
+            f.size if f.size is not None else file_size(dist.locate_file(f))
+            for f in dist.files or ()
+        )
+        results[name] = f"{size / (1024 * 1024):.2f} MB"
+        total_size += size
+
+    total_mb = total_size / (1024 * 1024)
+    results["total"] = f"{total_mb:.2f} MB"
+
+    return results
+
+
+def run_check(check, *args):
+    try:
+        return check(*args)
+    except Exception as e:
+        return {"error": f"脚本执行失败: {type(e).__name__}: {e}"}
+
+
+def main():
+    request = json.loads(sys.argv[1])
+    with contextlib.redirect_stdout(sys.stderr):
+        results = {
+            "packages": run_check(package_availability, request["expected_packages"]),
+            "routing": run_check(service_routing, request["test_services"]),
+            "size": run_check(installation_size),
+        }
+    json.dump(results, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Service probe run inside a test environment.
+
+Usage: python -m _opendal_service_probe '[["memory", "should_work"], ...]'
+
+Imports opendal once, creates each service's Operator concurrently and runs a
+read/write round trip on the local services. Writes one {"output": ..., "error": ...}
+per service to stdout as a JSON list.
+"""
+
+import json
+import sys
+import tempfile
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+CONFIGS = {
+    "memory": {},
+    "fs": {"root": None},
+    "redis": {"endpoint": "redis://localhost:6379"},
+    "sqlite": {"connection_string": "sqlite:///test.db", "table": "test_table"},
+    "sled": {"datadir": None},
+    "dropbox": {"access_token": "test_token"},
+    "dashmap": {},
+    "moka": {},
+    "azfile": {"endpoint": "https://test.file.core.windows.net", "share_name": "test"},
+    "cacache": {"datadir": None},
+}
+
+# Services that need no external server, so their I/O can be fully tested
+IO_SERVICES = frozenset({"memory", "fs", "dashmap", "moka"})
+
+
+def probe_io(op, lines):
+    test_key = "test_service_probe"
+    test_data = b"Hello OpenDAL!"
+    try:
+        op.write(test_key, test_data)
+        read_data = op.read(test_key)
+        if read_data != test_data:
+            lines.append(f"❌ I/O 数据不匹配: {read_data} != {test_data}")
+            return
+        lines.append("✅ I/O 测试完全成功")
+
+        stat = op.stat(test_key)
+        lines.append(f"✅ 元数据测试成功: {stat.content_length} bytes")
+
+        try:
+            op.delete(test_key)
+            lines.append("✅ 删除测试成功")
+        except Exception:
+            lines.append("⚠️ 删除测试跳过（可能不支持）")
+    except Exception as io_e:
+        lines.append(f"⚠️ I/O 测试失败: {io_e}")
+
+
+def probe(opendal, import_error, service_name, expected_result):
+    lines = []
+    error = None
+    try:
+        if import_error is not None:
+            raise import_error
+
+        # Options set to None get a fresh temporary directory
+        config = {
+            key: tempfile.mkdtemp() if value is None else value
+            for key, value in CONFIGS.get(service_name, {}).items()
+        }
+
+        op = opendal.Operator(service_name, **config)
+        lines.append("✅ Operator 创建成功")
+
+        if service_name in IO_SERVICES:
+            probe_io(op, lines)
+        else:
+            lines.append("⚠️ 仅配置验证（需要外部服务或凭证）")
+
+    except ImportError as e:
+        if expected_result == "should_fail":
+            lines.append(f"✅ 预期的导入失败: {e}")
+        else:
+            lines.append(f"❌ 意外的导入失败: {e}")
+            error = traceback.format_exc()
+
+    except Exception as e:
+        # Only the missing-package ImportError is an expected failure
+        lines.append(f"⚠️ 其他错误: {type(e).__name__}: {e}")
+        error = traceback.format_exc()
+
+    return {"output": "\n".join(lines), "error": error}
+
+
+def main():
+    try:
+        import opendal
+        import_error = None
+    except ImportError as e:
+        opendal = None
+        import_error = e
+
+    # The services use separate data directories, and the extension releases the
+    # GIL during blocking I/O, so they are probed concurrently
+    services = json.loads(sys.argv[1])
+    with ThreadPoolExecutor(max_workers=max(len(services), 1)) as pool:
+        results = list(pool.map(
+            lambda service: probe(opendal, import_error, *service), services
+        ))
+    json.dump(results, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
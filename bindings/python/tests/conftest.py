@@ -16,6 +16,7 @@
 # under the License.
 
 import os
+import shutil
 from uuid import uuid4
 
 import pytest
@@ -47,16 +48,22 @@ def service_name():
 def setup_config(service_name):
     # Read arguments from envs.
     prefix = f"opendal_{service_name}_"
-    config = {}
-    for key in os.environ.keys():
-        if key.lower().startswith(prefix):
-            config[key[len(prefix) :].lower()] = os.environ.get(key)
+    prefix_len = len(prefix)
+    config = {
+        key[prefix_len:].lower(): value
+        for key, value in os.environ.items()
+        if key[:prefix_len].lower() == prefix
+    }
     disable_random_root = (
         True if os.environ.get("OPENDAL_DISABLE_RANDOM_ROOT") == "true" else False
     )
     if not disable_random_root:
         config["root"] = f"{config.get('root', '/')}/{str(uuid4())}/"
-    return config
+    yield config
+    # The random root is created per session (and per xdist worker); remove
+    # it so local fs runs don't leave a directory behind on every run.
+    if service_name == "fs" and not disable_random_root:
+        shutil.rmtree(config["root"], ignore_errors=True)
 
 
 @pytest.fixture(scope="session")
@@ -74,22 +81,38 @@ def operator(async_operator):
     return async_operator.to_operator()
 
 
-@pytest.fixture(autouse=True)
-def check_capability(request, operator, async_operator):
-    if request.node.get_closest_marker("need_capability"):
-        if request.node.get_closest_marker("need_capability").args:
-            if not all(
-                [
-                    getattr(operator.capability(), x)
-                    for x in request.node.get_closest_marker("need_capability").args
-                ]
-                + [
-                    getattr(async_operator.capability(), x)
-                    for x in request.node.get_closest_marker("need_capability").args
-                ]
-            ):
-                pytest.skip(
-                    "skip because "
-                    f"{request.node.get_closest_marker('need_capability').args}"
-                    " not supported"
-                )
+def pytest_collection_modifyitems(config, items):
+    # Only tests marked with need_capability pay for the operator and the
+    # capability lookup.
+    for item in items:
+        if item.get_closest_marker("need_capability"):
+            item.fixturenames.insert(0, "check_capability")
+
+
+@pytest.fixture(scope="session")
+def capability_names(operator):
+    return frozenset(
+        name for name in dir(operator.capability()) if not name.startswith("_")
+    )
+
+
+@pytest.fixture(scope="session")
+def supported_capabilities(operator, async_operator, capability_names):
+    # Capabilities enabled on both the sync and the async operator, collected
+    # once per session instead of once per test.
+    def enabled(capability):
+        return {name for name in capability_names if getattr(capability, name, False)}
+
+    return frozenset(
+        enabled(operator.capability()) & enabled(async_operator.capability())
+    )
+
+
+@pytest.fixture
+def check_capability(request, capability_names, supported_capabilities):
+    capabilities = request.node.get_closest_marker("need_capability").args
+    unknown = set(capabilities) - capability_names
+    if unknown:
+        pytest.fail(f"unknown capabilities {sorted(unknown)} in need_capability")
+    if not supported_capabilities.issuperset(capabilities):
+        pytest.skip(f"skip because {capabilities} not supported")
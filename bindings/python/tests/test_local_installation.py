@@ -9,31 +9,49 @@
 4. 清晰的结果 - 脚本输出导入和安装成功/失败信息
 """
 
-import subprocess
+import contextlib
+import io
+import os
 import sys
 import tempfile
-import os
-import shutil
-import json
-from pathlib import Path
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Set, Tuple
+
+from _common import (
+    BINDING_DIR,
+    REPORT_DIR,
+    TEMP_ROOT,
+    create_venv,
+    dump_json,
+    installed_distributions,
+    remove_tree_later,
+    run_pip,
+    run_service_probe,
+)
 
 
 class LocalInstallationTest:
     def __init__(self):
         self.test_results = {}
-        self.original_dir = os.getcwd()
-        self.base_dir = Path("/Users/wang/i/opendal/bindings/python")
+        self.base_dir = BINDING_DIR
+        # 包名到本地源码目录的映射
+        self.package_paths = {
+            'opendal-core': self.base_dir / "packages/opendal-core",
+            'opendal-database': self.base_dir / "packages/opendal-database",
+            'opendal-cloud': self.base_dir / "packages/opendal-cloud",
+            'opendal-advanced': self.base_dir / "packages/opendal-advanced",
+            'opendal': self.base_dir
+        }
+        self.report_file = REPORT_DIR / "local_installation_report.json"
         
     def create_clean_environment(self, env_name: str):
         """创建干净的测试环境"""
         print(f"\n🐍 创建环境: {env_name}")
         
-        temp_dir = tempfile.mkdtemp(prefix=f"opendal_local_{env_name}_")
-        os.chdir(temp_dir)
+        temp_dir = tempfile.mkdtemp(prefix=f"opendal_local_{env_name}_", dir=TEMP_ROOT)
         
         # 创建虚拟环境
-        subprocess.run([sys.executable, "-m", "venv", "test_env"], check=True, capture_output=True)
+        create_venv(os.path.join(temp_dir, "test_env"))
         
         # 获取路径
         if sys.platform == "win32":
@@ -48,133 +66,62 @@ class LocalInstallationTest:
 
     def cleanup_environment(self, temp_dir: str):
         """清理测试环境"""
-        os.chdir(self.original_dir)
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        remove_tree_later(temp_dir)
 
-    def install_packages_locally(self, pip_path: str, packages_to_install: List[str]):
-        """本地安装指定的包"""
+    def install_packages_locally(self, pip_path: str, packages_to_install: List[str], installed: Set[str]):
+        """本地安装指定的包，installed 中记录的已安装包不再重复安装"""
         print(f"\n📦 本地安装包: {packages_to_install}")
         
-        # 定义包路径映射
-        package_paths = {
-            'opendal-core': self.base_dir / "packages/opendal-core",
-            'opendal-database': self.base_dir / "packages/opendal-database", 
-            'opendal-cloud': self.base_dir / "packages/opendal-cloud",
-            'opendal-advanced': self.base_dir / "packages/opendal-advanced",
-            'opendal': self.base_dir
-        }
-        
-        installed_packages = []
+        package_paths = self.package_paths
         
+        to_install = []
         for package in packages_to_install:
-            if package in package_paths:
-                package_path = package_paths[package]
-                print(f"  安装 {package} 从 {package_path}")
-                
-                # 使用可编辑模式安装
-                result = subprocess.run([pip_path, "install", "-e", str(package_path)], 
-                                      capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    installed_packages.append(package)
-                    print(f"    ✅ {package} 安装成功")
-                else:
-                    print(f"    ❌ {package} 安装失败: {result.stderr}")
-                    raise Exception(f"安装 {package} 失败: {result.stderr}")
+            if package in installed:
+                print(f"  {package} 已在环境中，跳过")
+            elif package in package_paths:
+                print(f"  安装 {package} 从 {package_paths[package]}")
+                to_install.append(package)
             else:
                 print(f"    ⚠️ 未知包: {package}")
         
+        if to_install:
+            # 使用可编辑模式安装；所有包交给同一次 pip 调用，只启动一次 pip 并一起解析依赖
+            editable_args = []
+            for package in to_install:
+                editable_args += ["-e", str(package_paths[package])]
+            result = run_pip([pip_path, "install", *editable_args])
+            
+            if result.returncode != 0:
+                print(f"    ❌ {', '.join(to_install)} 安装失败: {result.stderr}")
+                raise Exception(f"安装 {', '.join(to_install)} 失败: {result.stderr}")
+            
+            installed.update(to_install)
+            for package in to_install:
+                print(f"    ✅ {package} 安装成功")
+        
+        installed_packages = [package for package in packages_to_install if package in installed]
+        
         return installed_packages
 
-    def test_package_functionality(self, python_path: str, test_services: List[Tuple[str, str]]):
+    def test_package_functionality(self, python_path: str, test_services: List[Tuple[str, str]], work_dir: str):
         """测试包功能"""
         print(f"\n🔧 测试包功能...")
         
         service_results = {}
         
-        for service_name, expected_result in test_services:
-            print(f"\n  测试服务: {service_name}")
-            
-            test_script = f'''
-import sys
-import tempfile
-import os
-
-try:
-    import opendal
-    
-    # 服务配置
-    configs = {{
-        "memory": {{}},
-        "fs": {{"root": tempfile.gettempdir()}},
-        "redis": {{"endpoint": "redis://localhost:6379"}},
-        "sqlite": {{"connection_string": "sqlite:///test.db", "table": "test_table"}},
-        "sled": {{"datadir": tempfile.mkdtemp()}},
-        "dropbox": {{"access_token": "test_token"}},
-        "dashmap": {{}},
-        "moka": {{}},
-        "azfile": {{"endpoint": "https://test.file.core.windows.net", "share_name": "test"}},
-        "cacache": {{"datadir": tempfile.mkdtemp()}},
-    }}
-    
-    config = configs.get("{service_name}", {{}})
-    
-    # 尝试创建 Operator
-    op = opendal.Operator("{service_name}", **config)
-    print("✅ Operator 创建成功")
-    
-    # 对于内存类服务，进行完整 I/O 测试
-    if "{service_name}" in ["memory", "fs", "dashmap", "moka"]:
-        try:
-            test_key = "test_local_install"
-            test_data = b"Hello Local Install!"
-            
-            op.write(test_key, test_data)
-            read_data = op.read(test_key)
-            
-            if read_data == test_data:
-                print("✅ I/O 测试完全成功")
-                
-                # 测试元数据
-                stat = op.stat(test_key)
-                print(f"✅ 元数据测试成功: {{stat.content_length}} bytes")
-                
-                # 测试删除
-                try:
-                    op.delete(test_key)
-                    print("✅ 删除测试成功")
-                except:
-                    print("⚠️ 删除测试跳过（可能不支持）")
-                    
-            else:
-                print(f"❌ I/O 数据不匹配: {{read_data}} != {{test_data}}")
-                
-        except Exception as io_e:
-            print(f"⚠️ I/O 测试失败: {{io_e}}")
-    else:
-        print("⚠️ 仅配置验证（需要外部服务或凭证）")
-
-except ImportError as e:
-    if "{expected_result}" == "should_fail":
-        print(f"✅ 预期的导入失败: {{e}}")
-    else:
-        print(f"❌ 意外的导入失败: {{e}}")
+        outcomes = run_service_probe(python_path, test_services, cwd=work_dir)
         
-except Exception as e:
-    print(f"⚠️ 其他错误: {{type(e).__name__}}: {{e}}")
-'''
-            
-            result = subprocess.run([python_path, "-c", test_script], 
-                                  capture_output=True, text=True)
+        for (service_name, expected_result), outcome in zip(test_services, outcomes):
+            print(f"\n  测试服务: {service_name}")
             
-            output = result.stdout.strip()
-            success = "✅" in output and result.returncode == 0
+            output = outcome['output']
+            success = "✅" in output
             
             service_results[service_name] = {
                 'expected': expected_result,
                 'success': success,
                 'output': output,
-                'stderr': result.stderr if result.stderr else None
+                'stderr': outcome['error']
             }
             
             # 打印结果
@@ -188,38 +135,75 @@ except Exception as e:
         
         return service_results
 
-    def test_installation_scenario(self, scenario_name: str, packages_to_install: List[str], test_services: List[Tuple[str, str]]):
-        """测试一个安装场景"""
+    def run_scenarios(self, scenarios: List[Dict], env_name: str) -> Dict[str, Dict]:
+        """在同一个环境中依次运行多个场景，返回 {场景名: 场景结果}
+        
+        场景之间只安装缺少的包、卸载不再需要的包，不重复创建环境和安装公共包
+        """
+        temp_dir, python_path, pip_path = self.create_clean_environment(env_name)
+        installed = set()
+        results = {}
+        
+        try:
+            for scenario in scenarios:
+                # 卸载上一个场景安装、本场景不需要的包
+                extra = installed.difference(scenario['packages'])
+                if extra:
+                    print(f"\n🧹 卸载: {sorted(extra)}")
+                    result = run_pip([pip_path, "uninstall", "-y", *sorted(extra)])
+                    if result.returncode == 0:
+                        installed -= extra
+                    else:
+                        # 环境状态不确定，换一个新环境
+                        self.cleanup_environment(temp_dir)
+                        temp_dir, python_path, pip_path = self.create_clean_environment(env_name)
+                        installed.clear()
+                
+                results[scenario['name']] = self.test_installation_scenario(
+                    scenario['name'],
+                    scenario['packages'],
+                    scenario['test_services'],
+                    temp_dir,
+                    python_path,
+                    pip_path,
+                    installed
+                )
+        
+        finally:
+            self.cleanup_environment(temp_dir)
+        
+        return results
+
+    def test_installation_scenario(self, scenario_name: str, packages_to_install: List[str], test_services: List[Tuple[str, str]],
+                                   temp_dir: str, python_path: str, pip_path: str, installed: Set[str]) -> Dict:
+        """在给定环境中测试一个安装场景，返回场景结果"""
         print(f"\n{'='*70}")
         print(f"🧪 测试场景: {scenario_name}")
         print(f"📦 安装包: {packages_to_install}")
         
-        temp_dir, python_path, pip_path = self.create_clean_environment(scenario_name.replace(' ', '_'))
-        
         try:
-            # 1. 安装包
-            installed_packages = self.install_packages_locally(pip_path, packages_to_install)
+            # 1. 安装包（环境中已有的包不再重复安装）
+            installed_packages = self.install_packages_locally(pip_path, packages_to_install, installed)
             
             # 2. 验证安装
             print(f"\n🔍 验证安装...")
-            list_result = subprocess.run([pip_path, "list"], capture_output=True, text=True)
-            installed_list = list_result.stdout
+            installed_names = installed_distributions(python_path)
             
             verified_packages = {}
             for package in packages_to_install:
-                package_found = package.replace('-', '_') in installed_list or package in installed_list
+                package_found = package in installed_names
                 verified_packages[package] = "✅ 已安装" if package_found else "❌ 未找到"
                 print(f"  {package}: {'✅ 已安装' if package_found else '❌ 未找到'}")
             
             # 3. 测试功能
-            service_results = self.test_package_functionality(python_path, test_services)
+            service_results = self.test_package_functionality(python_path, test_services, temp_dir)
             
             # 4. 汇总结果
             total_packages = len(packages_to_install)
-            verified_count = len([v for v in verified_packages.values() if "✅" in v])
+            verified_count = sum(1 for v in verified_packages.values() if "✅" in v)
             
             total_services = len(test_services)
-            working_services = len([s for s in service_results.values() if s['success']])
+            working_services = sum(1 for s in service_results.values() if s['success'])
             
             scenario_result = {
                 'scenario_name': scenario_name,
@@ -232,25 +216,21 @@ except Exception as e:
                 'overall_success': verified_count == total_packages and working_services >= total_services * 0.7
             }
             
-            self.test_results[scenario_name] = scenario_result
-            
             print(f"\n📊 {scenario_name} 结果摘要:")
             print(f"  包安装: {verified_count}/{total_packages}")
             print(f"  服务功能: {working_services}/{total_services}")
             print(f"  整体状态: {'✅ 通过' if scenario_result['overall_success'] else '❌ 需要改进'}")
             
         except Exception as e:
-            error_result = {
+            scenario_result = {
                 'scenario_name': scenario_name,
                 'packages_to_install': packages_to_install,
                 'error': str(e),
                 'overall_success': False
             }
-            self.test_results[scenario_name] = error_result
             print(f"\n❌ {scenario_name} 测试失败: {e}")
         
-        finally:
-            self.cleanup_environment(temp_dir)
+        return scenario_result
 
     def run_all_local_tests(self):
         """运行所有本地安装测试"""
@@ -312,16 +292,28 @@ except Exception as e:
             }
         ]
         
-        # 运行每个场景
+        # 场景分给多个进程并行运行，每个进程在自己的环境中依次运行分到的场景；
+        # 进程数不超过 CPU 核数，避免同时运行过多 pip
+        results = {}
+        max_workers = min(os.cpu_count() or 1, len(scenarios))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_run_scenarios, scenarios[i::max_workers], f"worker{i}")
+                for i in range(max_workers)
+            ]
+            for future in as_completed(futures):
+                worker_results, output = future.result()
+                results.update(worker_results)
+                sys.stdout.write(output)
+                # 每个进程完成后立即落盘，运行中途崩溃也能保留已有结果
+                dump_json(results, self.report_file)
+        
+        # 按场景定义顺序记录结果
         for scenario in scenarios:
-            self.test_installation_scenario(
-                scenario['name'],
-                scenario['packages'],
-                scenario['test_services']
-            )
+            self.test_results[scenario['name']] = results[scenario['name']]
         
         # 生成最终报告
-        self.generate_final_report()
+        return self.generate_final_report()
 
     def generate_final_report(self):
         """生成最终报告"""
@@ -330,7 +322,7 @@ except Exception as e:
         print("="*70)
         
         total_scenarios = len(self.test_results)
-        successful_scenarios = len([r for r in self.test_results.values() if r.get('overall_success', False)])
+        successful_scenarios = sum(1 for r in self.test_results.values() if r.get('overall_success', False))
         
         print(f"\n📋 总体结果:")
         print(f"  测试场景: {total_scenarios}")
@@ -367,15 +359,23 @@ except Exception as e:
             print(f"\n⚠️ 需要改进一些场景")
         
         # 保存详细报告
-        report_file = Path("/Users/wang/i/opendal/bindings/python/tests/local_installation_report.json")
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(self.test_results, f, indent=2, ensure_ascii=False)
+        dump_json(self.test_results, self.report_file)
         
-        print(f"\n📄 详细报告已保存到: {report_file}")
+        print(f"\n📄 详细报告已保存到: {self.report_file}")
         
         return successful_scenarios >= total_scenarios * 0.8
 
 
+def _run_scenarios(scenarios: List[Dict], env_name: str) -> Tuple[Dict[str, Dict], str]:
+    """在工作进程中依次运行一组场景，返回 ({场景名: 场景结果}, 输出)
+
+    输出先缓冲，由主进程统一打印，避免并行场景的输出交错
+    """
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        results = LocalInstallationTest().run_scenarios(scenarios, env_name)
+    return results, output.getvalue()
+
+
 if __name__ == "__main__":
     tester = LocalInstallationTest()
     success = tester.run_all_local_tests()
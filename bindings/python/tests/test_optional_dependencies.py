@@ -5,30 +5,44 @@
 测试 pip install opendal[database] 等按需安装功能
 """
 
+import contextlib
+import io
+import os
 import subprocess
 import sys
 import tempfile
-import os
-import shutil
-import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from _common import (
+    BINDING_DIR,
+    REPORT_DIR,
+    TEMP_ROOT,
+    create_venv,
+    dump_json,
+    installed_distributions,
+    newest_wheel,
+    package_wheel,
+    remove_tree_later,
+    run_pip,
+    run_service_probe,
+)
+
 
 class OptionalDependencyTest:
     def __init__(self):
         self.test_results = {}
-        self.original_dir = os.getcwd()
+        self.report_file = REPORT_DIR / "optional_dependency_report.json"
         
     def create_test_environment(self, env_name: str):
         """创建测试环境"""
         print(f"\n🐍 创建测试环境: {env_name}")
         
-        temp_dir = tempfile.mkdtemp(prefix=f"opendal_optional_{env_name}_")
-        os.chdir(temp_dir)
+        temp_dir = tempfile.mkdtemp(prefix=f"opendal_optional_{env_name}_", dir=TEMP_ROOT)
         
         # 创建虚拟环境
-        subprocess.run([sys.executable, "-m", "venv", "test_env"], check=True, capture_output=True)
+        create_venv(os.path.join(temp_dir, "test_env"))
         
         # 获取路径
         if sys.platform == "win32":
@@ -43,32 +57,55 @@ class OptionalDependencyTest:
 
     def cleanup_environment(self, temp_dir: str):
         """清理测试环境"""
-        os.chdir(self.original_dir)
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        remove_tree_later(temp_dir)
 
     def setup_local_package_index(self, pip_path: str):
         """设置本地包索引（模拟 PyPI）"""
         print("📦 设置本地包...")
         
-        # 安装所有本地构建的包
+        # 安装所有本地构建的包（各包 dist 目录中最新的 wheel）
         wheels = [
-            "/Users/wang/i/opendal/bindings/python/packages/opendal-core/dist/opendal_core-0.46.0-cp311-cp311-macosx_11_0_arm64.whl",
-            "/Users/wang/i/opendal/bindings/python/packages/opendal-database/dist/opendal_database-0.46.0-cp311-cp311-macosx_11_0_arm64.whl",
-            "/Users/wang/i/opendal/bindings/python/packages/opendal-cloud/dist/opendal_cloud-0.46.0-cp311-cp311-macosx_11_0_arm64.whl",
-            "/Users/wang/i/opendal/bindings/python/packages/opendal-advanced/dist/opendal_advanced-0.46.0-cp311-cp311-macosx_11_0_arm64.whl"
+            package_wheel(name)
+            for name in ("opendal-core", "opendal-database", "opendal-cloud", "opendal-advanced")
         ]
         
         for wheel in wheels:
-            if Path(wheel).exists():
-                result = subprocess.run([pip_path, "install", wheel], capture_output=True, text=True)
-                if result.returncode != 0:
-                    raise Exception(f"安装失败 {wheel}: {result.stderr}")
-                print(f"  ✅ 已安装: {Path(wheel).name}")
-            else:
+            if not wheel.exists():
                 raise Exception(f"Wheel 文件不存在: {wheel}")
+        
+        # 一次 pip 调用安装全部 wheel
+        result = run_pip([pip_path, "install", *wheels])
+        if result.returncode != 0:
+            raise Exception(f"安装失败: {result.stderr}")
+        for wheel in wheels:
+            print(f"  ✅ 已安装: {wheel.name}")
 
-    def test_installation_scenario(self, scenario_name: str, install_options: str, expected_packages: List[str], test_services: List[Tuple[str, str]]):
-        """测试一个安装场景"""
+    def build_meta_wheel(self) -> Path:
+        """构建最新的元包，返回 wheel 路径；已有的 wheel 比源码新时直接复用"""
+        build_dir = BINDING_DIR
+        dist_dir = build_dir / "dist"
+        
+        latest_meta_wheel = newest_wheel(dist_dir, "opendal-")
+        if latest_meta_wheel is not None and latest_meta_wheel.stat().st_mtime >= _newest_mtime(build_dir):
+            print(f"\n📦 元包已是最新，跳过构建: {latest_meta_wheel.name}")
+            return latest_meta_wheel
+        
+        print("\n📦 构建元包...")
+        build_result = subprocess.run(["uv", "build", ".", "--wheel"], 
+                                    cwd=build_dir, capture_output=True, text=True)
+        if build_result.returncode != 0:
+            raise Exception(f"构建元包失败: {build_result.stderr}")
+        
+        # 找到最新构建的元包
+        latest_meta_wheel = newest_wheel(dist_dir, "opendal-")
+        if latest_meta_wheel is None:
+            raise Exception("未找到元包 wheel")
+        
+        print(f"📦 使用元包: {latest_meta_wheel.name}")
+        return latest_meta_wheel
+
+    def test_installation_scenario(self, scenario_name: str, install_options: str, expected_packages: List[str], test_services: List[Tuple[str, str]], latest_meta_wheel: Path) -> Dict:
+        """测试一个安装场景，返回场景结果"""
         print(f"\n{'='*70}")
         print(f"🧪 测试场景: {scenario_name}")
         print(f"📦 安装选项: opendal{install_options}")
@@ -79,32 +116,16 @@ class OptionalDependencyTest:
             # 1. 设置本地包
             self.setup_local_package_index(pip_path)
             
-            # 2. 重新构建元包并安装
+            # 2. 安装元包（所有场景共用运行前构建好的元包）
             print(f"\n📥 安装元包: opendal{install_options}")
             
-            # 先构建最新的元包
-            build_dir = "/Users/wang/i/opendal/bindings/python"
-            build_result = subprocess.run(["uv", "build", ".", "--wheel"], 
-                                        cwd=build_dir, capture_output=True, text=True)
-            if build_result.returncode != 0:
-                raise Exception(f"构建元包失败: {build_result.stderr}")
-            
-            # 找到最新构建的元包
-            dist_dir = Path(build_dir) / "dist"
-            meta_wheels = list(dist_dir.glob("opendal-*.whl"))
-            if not meta_wheels:
-                raise Exception("未找到元包 wheel")
-            
-            latest_meta_wheel = max(meta_wheels, key=lambda p: p.stat().st_mtime)
-            print(f"📦 使用元包: {latest_meta_wheel.name}")
-            
             # 安装元包（使用可选依赖）
             if install_options:
                 install_cmd = [pip_path, "install", f"{latest_meta_wheel}{install_options}"]
             else:
                 install_cmd = [pip_path, "install", str(latest_meta_wheel)]
             
-            result = subprocess.run(install_cmd, capture_output=True, text=True)
+            result = run_pip(install_cmd)
             if result.returncode != 0:
                 raise Exception(f"元包安装失败: {result.stderr}")
             
@@ -112,12 +133,11 @@ class OptionalDependencyTest:
             
             # 3. 验证已安装的包
             print(f"\n🔍 验证安装的包...")
-            list_result = subprocess.run([pip_path, "list"], capture_output=True, text=True)
-            installed_packages = list_result.stdout
+            installed_names = installed_distributions(python_path)
             
             package_check = {}
             for expected_pkg in expected_packages:
-                if expected_pkg.replace('_', '-') in installed_packages:
+                if expected_pkg.replace('_', '-') in installed_names:
                     package_check[expected_pkg] = "✅ 已安装"
                     print(f"  {expected_pkg}: ✅ 已安装")
                 else:
@@ -128,69 +148,12 @@ class OptionalDependencyTest:
             print(f"\n🔧 测试服务可用性...")
             service_results = {}
             
-            for service_name, expected_result in test_services:
+            outcomes = run_service_probe(python_path, test_services, cwd=temp_dir)
+            
+            for (service_name, expected_result), outcome in zip(test_services, outcomes):
+                service_output = outcome['output']
                 print(f"\n  测试服务: {service_name}")
                 
-                test_script = f'''
-import sys
-import tempfile
-import os
-
-try:
-    import opendal
-    
-    # 基本配置
-    if "{service_name}" == "memory":
-        config = {{}}
-    elif "{service_name}" == "fs":
-        config = {{"root": tempfile.gettempdir()}}
-    elif "{service_name}" == "redis":
-        config = {{"endpoint": "redis://localhost:6379"}}
-    elif "{service_name}" == "sqlite":
-        config = {{"connection_string": "sqlite:///test.db", "table": "test_table"}}
-    elif "{service_name}" == "dropbox":
-        config = {{"access_token": "test_token"}}
-    elif "{service_name}" == "dashmap":
-        config = {{}}
-    elif "{service_name}" == "azfile":
-        config = {{"endpoint": "https://test.file.core.windows.net", "share_name": "test"}}
-    elif "{service_name}" == "cacache":
-        config = {{"datadir": tempfile.mkdtemp()}}
-    else:
-        config = {{}}
-    
-    # 尝试创建 Operator
-    op = opendal.Operator("{service_name}", **config)
-    print("✅ 服务可用")
-    
-    # 对于可以完整测试的服务，进行 I/O 测试
-    if "{service_name}" in ["memory", "fs", "dashmap"]:
-        try:
-            op.write("test_key", b"test_data")
-            data = op.read("test_key")
-            if data == b"test_data":
-                print("✅ I/O 测试成功")
-            else:
-                print("⚠️ I/O 测试数据不匹配")
-        except Exception as io_e:
-            print(f"⚠️ I/O 测试失败: {{io_e}}")
-
-except ImportError as e:
-    if "{expected_result}" == "should_fail":
-        print(f"✅ 预期的导入失败: {{e}}")
-    else:
-        print(f"❌ 意外的导入失败: {{e}}")
-except Exception as e:
-    if "{expected_result}" == "should_fail":
-        print(f"✅ 预期的错误: {{type(e).__name__}}: {{e}}")
-    else:
-        print(f"❌ 意外错误: {{type(e).__name__}}: {{e}}")
-'''
-                
-                result = subprocess.run([python_path, "-c", test_script], 
-                                      capture_output=True, text=True)
-                
-                service_output = result.stdout.strip()
                 service_success = "✅" in service_output
                 
                 service_results[service_name] = {
@@ -214,10 +177,10 @@ except Exception as e:
             
             # 5. 汇总结果
             total_packages = len(expected_packages)
-            installed_count = len([p for p in package_check.values() if "✅" in p])
+            installed_count = sum(1 for p in package_check.values() if "✅" in p)
             
             total_services = len(test_services)
-            working_services = len([s for s in service_results.values() if s['success']])
+            working_services = sum(1 for s in service_results.values() if s['success'])
             
             scenario_result = {
                 'scenario_name': scenario_name,
@@ -229,25 +192,24 @@ except Exception as e:
                 'overall_success': installed_count == total_packages and working_services >= total_services * 0.8
             }
             
-            self.test_results[scenario_name] = scenario_result
-            
             print(f"\n📊 {scenario_name} 结果摘要:")
             print(f"  包安装率: {installed_count}/{total_packages}")
             print(f"  服务可用率: {working_services}/{total_services}")
             print(f"  整体状态: {'✅ 通过' if scenario_result['overall_success'] else '❌ 失败'}")
             
         except Exception as e:
-            error_result = {
+            scenario_result = {
                 'scenario_name': scenario_name,
                 'install_options': install_options,
                 'error': str(e),
                 'overall_success': False
             }
-            self.test_results[scenario_name] = error_result
             print(f"\n❌ {scenario_name} 测试失败: {e}")
         
         finally:
             self.cleanup_environment(temp_dir)
+        
+        return scenario_result
 
     def run_all_optional_dependency_tests(self):
         """运行所有可选依赖测试"""
@@ -313,17 +275,42 @@ except Exception as e:
             }
         ]
         
-        # 运行每个场景
+        # 元包只构建一次，避免并行场景同时写同一个 dist 目录
+        try:
+            latest_meta_wheel = self.build_meta_wheel()
+        except Exception as e:
+            print(f"\n❌ {e}")
+            for scenario in scenarios:
+                self.test_results[scenario['name']] = {
+                    'scenario_name': scenario['name'],
+                    'install_options': scenario['options'],
+                    'error': str(e),
+                    'overall_success': False
+                }
+            return self.generate_final_report()
+        
+        # 各场景使用独立的临时目录和虚拟环境，互不依赖，在多个进程中并行运行；
+        # 进程数不超过 CPU 核数，避免同时运行过多 pip
+        results = {}
+        max_workers = min(os.cpu_count() or 1, len(scenarios))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(_run_scenario, scenario, latest_meta_wheel): scenario['name']
+                for scenario in scenarios
+            }
+            for future in as_completed(futures):
+                scenario_result, output = future.result()
+                results[futures[future]] = scenario_result
+                sys.stdout.write(output)
+                # 每个场景完成后立即落盘，运行中途崩溃也能保留已有结果
+                dump_json(results, self.report_file)
+        
+        # 按场景定义顺序记录结果
         for scenario in scenarios:
-            self.test_installation_scenario(
-                scenario['name'],
-                scenario['options'],
-                scenario['expected_packages'],
-                scenario['test_services']
-            )
+            self.test_results[scenario['name']] = results[scenario['name']]
         
         # 生成最终报告
-        self.generate_final_report()
+        return self.generate_final_report()
 
     def generate_final_report(self):
         """生成最终报告"""
@@ -332,7 +319,7 @@ except Exception as e:
         print("="*70)
         
         total_scenarios = len(self.test_results)
-        successful_scenarios = len([r for r in self.test_results.values() if r.get('overall_success', False)])
+        successful_scenarios = sum(1 for r in self.test_results.values() if r.get('overall_success', False))
         
         print(f"\n📋 总体结果:")
         print(f"  测试场景: {total_scenarios}")
@@ -366,15 +353,48 @@ except Exception as e:
             print("  ❌ 需要重新检查依赖配置")
         
         # 保存详细报告
-        report_file = Path("/Users/wang/i/opendal/bindings/python/tests/optional_dependency_report.json")
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(self.test_results, f, indent=2, ensure_ascii=False)
+        dump_json(self.test_results, self.report_file)
         
-        print(f"\n📄 详细报告已保存到: {report_file}")
+        print(f"\n📄 详细报告已保存到: {self.report_file}")
         
         return successful_scenarios == total_scenarios
 
 
+def _newest_mtime(build_dir: Path) -> float:
+    """元包源码（pyproject.toml、README.md 和 python/opendal）中最新的修改时间"""
+    newest = 0.0
+    for path in (build_dir / "pyproject.toml", build_dir / "README.md"):
+        try:
+            newest = max(newest, path.stat().st_mtime)
+        except OSError:
+            pass
+    for root, dirs, files in os.walk(build_dir / "python" / "opendal"):
+        # 字节码缓存不进入 wheel，也会在导入时更新
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for name in files:
+            try:
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime)
+            except OSError:
+                pass
+    return newest
+
+
+def _run_scenario(scenario: Dict, latest_meta_wheel: Path) -> Tuple[Dict, str]:
+    """在工作进程中运行一个场景，返回 (场景结果, 输出)
+
+    输出先缓冲，由主进程统一打印，避免并行场景的输出交错
+    """
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        scenario_result = OptionalDependencyTest().test_installation_scenario(
+            scenario['name'],
+            scenario['options'],
+            scenario['expected_packages'],
+            scenario['test_services'],
+            latest_meta_wheel
+        )
+    return scenario_result, output.getvalue()
+
+
 if __name__ == "__main__":
     tester = OptionalDependencyTest()
     success = tester.run_all_optional_dependency_tests()
@@ -7,31 +7,98 @@
 场景3: 多个可选依赖组合 - 验证 pip install opendal[database,cloud]
 """
 
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import platform
 import subprocess
 import sys
 import tempfile
-import os
-import shutil
-import json
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from importlib import metadata
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from _common import (
+    BINDING_DIR,
+    REPORT_DIR,
+    TEMP_ROOT,
+    clone_venv,
+    create_venv,
+    dump_json,
+    newest_wheel,
+    remove_tree_later,
+    run_pip,
+    wait_for_removals,
+)
+
+# 从源码安装或构建会写入同一个源码目录（egg-info、扩展模块、dist），
+# 并行运行的场景之间用这把锁串行化；由 _init_worker 设置
+_SOURCE_TREE_LOCK = None
+
+# 场景 2 未能安装 opendal-database 时设置，场景 3 需要同一个扩展，据此提前跳过；
+# 并行运行时由 _init_worker 换成进程间共享的 Event
+_DATABASE_INSTALL_FAILED = threading.Event()
+
+
+def _init_worker(lock, database_install_failed) -> None:
+    global _SOURCE_TREE_LOCK, _DATABASE_INSTALL_FAILED
+    _SOURCE_TREE_LOCK = lock
+    _DATABASE_INSTALL_FAILED = database_install_failed
+
+
+def _source_tree_lock():
+    """返回源码目录锁；未设置时（例如单独调用某个场景）不加锁"""
+    return _SOURCE_TREE_LOCK if _SOURCE_TREE_LOCK is not None else contextlib.nullcontext()
+
+
+# 场景 2、3 依赖的基础包，位于 packages/ 下
+_BASE_PACKAGES = ("opendal-core", "opendal-database", "opendal-cloud", "opendal-advanced")
+
+# Caching successful scenario 2 and 3 results is opt-in: set OPENDAL_TEST_RESULT_CACHE
+# to the cache directory. OPENDAL_SCENARIO_FORCE reruns the scenarios and refreshes it.
+RESULT_CACHE_DIR = (
+    Path(os.environ["OPENDAL_TEST_RESULT_CACHE"])
+    if os.environ.get("OPENDAL_TEST_RESULT_CACHE")
+    else None
+)
+
+# 可以缓存结果的场景，{结果键: 场景方法名}
+_CACHEABLE_SCENARIOS = {
+    "scenario_2": "scenario_2_single_optional_dependency",
+    "scenario_3": "scenario_3_multiple_optional_dependencies",
+}
+
+# 计算缓存键时跳过的构建产物目录
+_SKIPPED_DIRS = {"target", "build", "dist", "__pycache__"}
+
 
 class OptionalDependencyScenarios:
     def __init__(self):
         self.test_results = {}
-        self.original_dir = os.getcwd()
-        self.base_dir = Path("/Users/wang/i/opendal/bindings/python")
+        self.base_dir = BINDING_DIR
+        self.report_file = REPORT_DIR / "optional_dependency_scenarios_report.json"
+        # 已安装基础包的模板环境目录，由 _prepare_template_env 创建
+        self._template_dir = None
+        # 元包 wheel，由 _build_meta_wheel 构建一次，场景 2、3 共用
+        self.meta_wheel = None
         
-    def create_test_environment(self, scenario_name: str):
-        """创建测试环境"""
+    def create_test_environment(self, scenario_name: str, template_dir: str = None):
+        """创建测试环境，给出 template_dir 时从模板环境复制"""
         print(f"\n🐍 创建环境: {scenario_name}")
         
-        temp_dir = tempfile.mkdtemp(prefix=f"opendal_scenario_{scenario_name}_")
-        os.chdir(temp_dir)
+        temp_dir = tempfile.mkdtemp(prefix=f"opendal_scenario_{scenario_name}_", dir=TEMP_ROOT)
         
         # 创建虚拟环境
-        subprocess.run([sys.executable, "-m", "venv", "env"], check=True, capture_output=True)
+        if template_dir is None:
+            create_venv(os.path.join(temp_dir, "env"))
+        else:
+            clone_venv(os.path.join(template_dir, "env"), os.path.join(temp_dir, "env"))
         
         # 获取路径
         if sys.platform == "win32":
@@ -46,28 +113,156 @@ class OptionalDependencyScenarios:
 
     def cleanup_environment(self, temp_dir: str):
         """清理环境"""
-        os.chdir(self.original_dir)
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        remove_tree_later(temp_dir)
+
+    def run_driver(self, python_path: str, driver: str, cases: list, work_dir: str) -> Tuple[Dict[str, str], List[str]]:
+        """在目标环境中用一个子进程运行 _opendal_scenario_driver 的 driver 检查全部用例
+        
+        返回 ({已安装的 opendal 相关包名: 版本}, 每个用例的输出)，包名为小写并以 - 连接；
+        驱动进程本身失败时包列表和所有用例的输出为空；输出是 ASCII 的 JSON，直接按字节解析
+        """
+        env = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parent)}
+        result = subprocess.run([python_path, "-m", "_opendal_scenario_driver", driver],
+                              input=json.dumps(cases).encode(), cwd=work_dir, capture_output=True, env=env)
+        try:
+            report = json.loads(result.stdout)
+            return report["packages"], report["outputs"]
+        except ValueError:
+            return {}, [''] * len(cases)
 
     def install_base_packages(self, pip_path: str):
         """安装基础包（为可选依赖测试做准备）"""
         print("📦 安装基础包...")
         
         # 首先安装所有子包，但不安装元包
-        packages = [
-            self.base_dir / "packages/opendal-core",
-            self.base_dir / "packages/opendal-database", 
-            self.base_dir / "packages/opendal-cloud",
-            self.base_dir / "packages/opendal-advanced"
-        ]
+        packages = [self.base_dir / "packages" / name for name in _BASE_PACKAGES]
         
+        # 所有包交给同一次 pip 调用，只启动一次 pip 并一起解析依赖
+        editable_args = []
+        for package_path in packages:
+            editable_args += ["-e", str(package_path)]
+        with _source_tree_lock():
+            result = run_pip([pip_path, "install", *editable_args])
+        if result.returncode != 0:
+            names = ", ".join(package_path.name for package_path in packages)
+            raise Exception(f"安装 {names} 失败: {result.stderr}")
         for package_path in packages:
-            result = subprocess.run([pip_path, "install", "-e", str(package_path)], 
-                                  capture_output=True, text=True)
-            if result.returncode != 0:
-                raise Exception(f"安装 {package_path.name} 失败: {result.stderr}")
             print(f"  ✅ {package_path.name}")
 
+    def _prepare_template_env(self):
+        """创建已安装全部基础包的模板环境，场景 2、3 从中复制，不再各自安装基础包
+
+        模板准备失败或在 Windows 上（脚本启动器内嵌路径，无法复制）时不使用模板，
+        各场景仍自行安装基础包。
+        """
+        if sys.platform == "win32":
+            return
+        temp_dir, python_path, pip_path = self.create_test_environment("template")
+        try:
+            self.install_base_packages(pip_path)
+        except Exception as e:
+            print(f"⚠️ 模板环境准备失败，各场景单独安装基础包: {e}")
+            self.cleanup_environment(temp_dir)
+            return
+        self._template_dir = temp_dir
+
+    def _build_meta_wheel(self, outdir: str) -> Path:
+        """构建一次元包 wheel 到 outdir，返回 wheel 路径
+
+        元包使用 setuptools 构建，--no-isolation 直接使用当前解释器中的 setuptools，
+        不必为构建创建隔离环境
+        """
+        print("\n📦 构建元包 wheel...")
+        with _source_tree_lock():
+            result = subprocess.run(
+                [sys.executable, "-m", "build", "--wheel", "--no-isolation", "--outdir", outdir],
+                cwd=str(self.base_dir), capture_output=True, text=True,
+            )
+        if result.returncode != 0:
+            raise Exception(f"构建元包失败: {result.stderr}")
+        
+        meta_wheel = newest_wheel(outdir, "opendal-")
+        if meta_wheel is None:
+            raise Exception("未找到元包wheel")
+        return meta_wheel
+
+    @staticmethod
+    def _toolchain_description() -> str:
+        """Interpreter, platform and build tool versions, including missing tools."""
+        parts = [sys.executable, sys.version, platform.platform(), platform.machine()]
+        for name in ("pip", "setuptools", "maturin"):
+            try:
+                parts.append(f"{name} {metadata.version(name)}")
+            except metadata.PackageNotFoundError:
+                parts.append(f"{name} missing")
+        try:
+            rustc = subprocess.run(["rustc", "-vV"], capture_output=True, text=True)
+            parts.append(rustc.stdout)
+        except OSError:
+            parts.append("rustc missing")
+        return "\n".join(parts)
+
+    def _results_cache_key(self) -> str:
+        """场景 2、3 全部输入的哈希：解释器、平台和构建工具版本、元包 wheel、
+        基础包及其依赖的 Rust 源码（共享绑定 shared 和 opendal core crate）、
+        工作区清单和锁文件以及测试脚本本身
+        
+        按文件内容计算，重新检出代码不会使缓存失效，任何改动都会得到新的键；
+        wheel 中记录了打包时间，按其中每个文件的内容计算
+        """
+        tests_dir = Path(__file__).resolve().parent
+        # 基础包通过 path 依赖使用的 opendal crate，位于仓库根目录的 core 下
+        core_dir = self.base_dir.parents[1] / "core"
+        # (名称, 路径)，名称与文件内容一起计入哈希；不存在的文件跳过
+        files = [(path.name, path) for path in (tests_dir / "test_optional_dependency_scenarios.py",
+                                                 tests_dir / "_opendal_scenario_driver.py",
+                                                 tests_dir / "_common.py")]
+        for name in ("Cargo.toml", "pyproject.toml", "uv.lock"):
+            files.append((f"workspace/{name}", self.base_dir / name))
+        for name in ("Cargo.toml", "Cargo.lock"):
+            files.append((f"core/{name}", core_dir / name))
+        files = [(label, path) for label, path in files if path.is_file()]
+        
+        trees = [(name, self.base_dir / "packages" / name) for name in _BASE_PACKAGES]
+        trees += [("shared", self.base_dir / "shared"), ("core/src", core_dir / "src")]
+        for name, tree_dir in trees:
+            for root, dirs, filenames in os.walk(tree_dir):
+                dirs[:] = sorted(d for d in dirs if d not in _SKIPPED_DIRS
+                                 and not d.startswith(".") and not d.endswith(".egg-info"))
+                for filename in sorted(filenames):
+                    path = Path(root, filename)
+                    files.append((f"{name}/{path.relative_to(tree_dir).as_posix()}", path))
+        
+        digest = hashlib.sha256(self._toolchain_description().encode())
+        for label, path in files:
+            digest.update(label.encode() + b"\0")
+            digest.update(path.read_bytes())
+        with zipfile.ZipFile(self.meta_wheel) as wheel:
+            for name in sorted(wheel.namelist()):
+                digest.update(name.encode() + b"\0")
+                digest.update(wheel.read(name))
+        return digest.hexdigest()
+
+    def _load_cached_results(self, cache_file: Path) -> Dict:
+        """读取缓存的场景结果，没有缓存或设置了 OPENDAL_SCENARIO_FORCE 时返回空字典"""
+        if os.environ.get("OPENDAL_SCENARIO_FORCE"):
+            return {}
+        try:
+            return json.loads(cache_file.read_bytes())
+        except (OSError, ValueError):
+            return {}
+
+    def _store_cached_results(self, cache_file: Path):
+        """只缓存成功的场景结果，失败的场景下次总会重新运行"""
+        results = {
+            key: {name: value for name, value in result.items() if name != 'cached'}
+            for key, result in self.test_results.items()
+            if key in _CACHEABLE_SCENARIOS and result.get('success', False)
+        }
+        if results:
+            RESULT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            dump_json(results, cache_file)
+
     def scenario_1_missing_dependencies(self):
         """场景1: 未安装可选依赖的行为测试"""
         print(f"\n{'='*70}")
@@ -82,31 +277,20 @@ class OptionalDependencyScenarios:
             core_package = self.base_dir / "packages/opendal-core"
             meta_package = self.base_dir
             
-            # 安装核心包
-            result = subprocess.run([pip_path, "install", "-e", str(core_package)], 
-                                  capture_output=True, text=True)
-            if result.returncode != 0:
-                raise Exception(f"安装核心包失败: {result.stderr}")
-            
-            # 安装元包（不带可选依赖）
-            result = subprocess.run([pip_path, "install", "-e", str(meta_package)], 
-                                  capture_output=True, text=True)
-            if result.returncode != 0:
-                raise Exception(f"安装元包失败: {result.stderr}")
+            with _source_tree_lock():
+                # 安装核心包
+                result = run_pip([pip_path, "install", "-e", str(core_package)])
+                if result.returncode != 0:
+                    raise Exception(f"安装核心包失败: {result.stderr}")
+                
+                # 安装元包（不带可选依赖）
+                result = run_pip([pip_path, "install", "-e", str(meta_package)])
+                if result.returncode != 0:
+                    raise Exception(f"安装元包失败: {result.stderr}")
             
             print("✅ 核心包安装完成")
             
             # 2. 验证已安装的包
-            list_result = subprocess.run([pip_path, "list"], capture_output=True, text=True)
-            installed_packages = list_result.stdout
-            print(f"\n📋 已安装包:")
-            for line in installed_packages.split('\n'):
-                if 'opendal' in line.lower() and line.strip():
-                    print(f"  {line.strip()}")
-            
-            # 3. 测试缺少依赖时的行为
-            print(f"\n🚨 测试缺少依赖时的行为:")
-            
             error_test_cases = [
                 ('redis', 'database'),
                 ('sqlite', 'database'), 
@@ -116,52 +300,21 @@ class OptionalDependencyScenarios:
                 ('cacache', 'advanced')
             ]
             
+            # 包列表和所有用例交给同一个子进程检查
+            installed_packages, outputs = self.run_driver(python_path, "missing_deps",
+                                                          error_test_cases, temp_dir)
+            print("\n📋 已安装包:")
+            for name, version in installed_packages.items():
+                print(f"  {name} {version}")
+            
+            # 3. 测试缺少依赖时的行为
+            print("\n🚨 测试缺少依赖时的行为:")
+            
             error_results = {}
             
-            for service, expected_package_type in error_test_cases:
+            for (service, expected_package_type), output in zip(error_test_cases, outputs):
                 print(f"\n  测试 {service} (期望提示安装 {expected_package_type}):")
                 
-                test_script = f'''
-try:
-    import opendal
-    
-    # 尝试使用需要额外依赖的服务
-    if "{service}" == "redis":
-        config = {{"endpoint": "redis://localhost:6379"}}
-    elif "{service}" == "sqlite":
-        config = {{"connection_string": "sqlite:///test.db", "table": "test_table"}}
-    elif "{service}" == "dropbox":
-        config = {{"access_token": "test_token"}}
-    elif "{service}" == "dashmap":
-        config = {{}}
-    elif "{service}" == "azfile":
-        config = {{"endpoint": "https://test.file.core.windows.net", "share_name": "test"}}
-    elif "{service}" == "cacache":
-        config = {{"datadir": "/tmp/cache"}}
-    else:
-        config = {{}}
-    
-    op = opendal.Operator("{service}", **config)
-    print("❌ 意外成功: 应该失败但却成功了")
-    
-except ImportError as e:
-    print(f"✅ 正确的导入错误: {{e}}")
-    
-    # 检查错误消息是否有用
-    error_msg = str(e).lower()
-    if "{expected_package_type}" in error_msg or "install" in error_msg:
-        print("✅ 错误消息包含有用信息")
-    else:
-        print("⚠️ 错误消息不够有用")
-        
-except Exception as e:
-    print(f"⚠️ 其他类型错误: {{type(e).__name__}}: {{e}}")
-'''
-                
-                result = subprocess.run([python_path, "-c", test_script], 
-                                      capture_output=True, text=True)
-                
-                output = result.stdout.strip()
                 has_useful_error = "正确的导入错误" in output and "有用信息" in output
                 
                 error_results[service] = {
@@ -176,7 +329,7 @@ except Exception as e:
                             print(f"    {line}")
             
             # 4. 汇总场景1结果
-            useful_errors = len([r for r in error_results.values() if r['has_useful_error']])
+            useful_errors = sum(1 for r in error_results.values() if r['has_useful_error'])
             total_tests = len(error_results)
             
             scenario_1_result = {
@@ -209,119 +362,60 @@ except Exception as e:
         print("🧪 场景2: 安装可选依赖的功能测试")
         print("目标: 验证 pip install opendal[database] 功能")
         
-        temp_dir, python_path, pip_path = self.create_test_environment("single_optional")
+        temp_dir, python_path, pip_path = self.create_test_environment("single_optional", self._template_dir)
         
         try:
-            # 1. 安装基础包
-            self.install_base_packages(pip_path)
+            # 1. 安装基础包（从模板复制的环境中已经安装）
+            if self._template_dir is None:
+                self.install_base_packages(pip_path)
             
             # 2. 安装带数据库扩展的元包
             print(f"\n📦 安装 opendal[database]...")
             
-            # 首先构建最新的元包
-            build_result = subprocess.run(["python", "-m", "build", "--wheel"], 
-                                        cwd=str(self.base_dir), capture_output=True, text=True)
-            if build_result.returncode != 0:
-                raise Exception(f"构建元包失败: {build_result.stderr}")
-            
-            # 找到最新的元包
-            dist_dir = self.base_dir / "dist"
-            meta_wheels = list(dist_dir.glob("opendal-*.whl"))
-            if not meta_wheels:
-                raise Exception("未找到元包wheel")
-            
-            latest_wheel = max(meta_wheels, key=lambda p: p.stat().st_mtime)
+            # 使用 run_all_scenarios 中构建好的元包 wheel
+            if self.meta_wheel is None:
+                raise Exception("未能构建元包wheel")
             
             # 安装带可选依赖的包
-            install_cmd = [pip_path, "install", f"{latest_wheel}[database]"]
-            result = subprocess.run(install_cmd, capture_output=True, text=True)
+            install_cmd = [pip_path, "install", f"{self.meta_wheel}[database]"]
+            result = run_pip(install_cmd)
             
             if result.returncode != 0:
-                print(f"⚠️ wheel安装失败，尝试可编辑模式...")
-                # 尝试可编辑模式
-                install_cmd = [pip_path, "install", "-e", f"{self.base_dir}[database]"]
-                result = subprocess.run(install_cmd, capture_output=True, text=True)
-                
-                if result.returncode != 0:
-                    raise Exception(f"安装失败: {result.stderr}")
+                _DATABASE_INSTALL_FAILED.set()
+                raise Exception(f"安装失败: {result.stderr}")
             
             print("✅ opendal[database] 安装成功")
             
             # 3. 验证安装的包
             print(f"\n🔍 验证安装的包:")
-            list_result = subprocess.run([pip_path, "list"], capture_output=True, text=True)
-            installed_list = list_result.stdout
+            database_services = [
+                ('redis', '配置验证'),
+                ('sqlite', '配置验证'),
+                ('sled', '完整功能')
+            ]
+            
+            # 包列表和所有服务交给同一个子进程测试
+            installed_packages, outputs = self.run_driver(python_path, "database",
+                                                      [[service] for service, _ in database_services], temp_dir)
             
             expected_packages = ['opendal', 'opendal-core', 'opendal-database']
-            package_check = {}
+            # 按规范化的包名精确匹配，opendal 不会误匹配 opendal-core
+            package_check = {pkg: pkg in installed_packages for pkg in expected_packages}
+            if not package_check['opendal-database']:
+                _DATABASE_INSTALL_FAILED.set()
             
-            for pkg in expected_packages:
-                found = pkg.replace('-', '_') in installed_list or pkg in installed_list
-                package_check[pkg] = found
+            for pkg, found in package_check.items():
                 print(f"  {pkg}: {'✅ 已安装' if found else '❌ 未安装'}")
             
             # 4. 测试数据库服务功能
             print(f"\n🔧 测试数据库服务功能:")
             
-            database_services = [
-                ('redis', '配置验证'),
-                ('sqlite', '配置验证'),
-                ('sled', '完整功能')
-            ]
-            
             service_results = {}
             
-            for service, test_type in database_services:
+            for (service, test_type), output in zip(database_services, outputs):
                 print(f"\n  测试 {service} ({test_type}):")
                 
-                test_script = f'''
-import tempfile
-import os
-
-try:
-    import opendal
-    
-    # 服务配置
-    if "{service}" == "redis":
-        config = {{"endpoint": "redis://localhost:6379"}}
-    elif "{service}" == "sqlite":
-        config = {{"connection_string": "sqlite:///test.db", "table": "test_table"}}
-    elif "{service}" == "sled":
-        config = {{"datadir": tempfile.mkdtemp()}}
-    else:
-        config = {{}}
-    
-    op = opendal.Operator("{service}", **config)
-    print("✅ Operator 创建成功")
-    
-    # 对于sled，尝试完整的I/O操作
-    if "{service}" == "sled":
-        try:
-            test_key = "scenario2_test"
-            test_data = b"Database test data"
-            
-            op.write(test_key, test_data)
-            read_data = op.read(test_key)
-            
-            if read_data == test_data:
-                print("✅ 完整I/O测试成功")
-            else:
-                print("❌ I/O数据不匹配")
-                
-        except Exception as io_e:
-            print(f"⚠️ I/O测试失败: {{io_e}}")
-    else:
-        print("✅ 配置验证通过")
-
-except Exception as e:
-    print(f"❌ 测试失败: {{type(e).__name__}}: {{e}}")
-'''
-                
-                result = subprocess.run([python_path, "-c", test_script], 
-                                      capture_output=True, text=True)
-                
-                output = result.stdout.strip()
-                success = "✅" in output and result.returncode == 0
+                success = "✅" in output
                 
                 service_results[service] = {
                     'test_type': test_type,
@@ -335,8 +429,8 @@ except Exception as e:
                             print(f"    {line}")
             
             # 5. 汇总场景2结果
-            packages_installed = len([p for p in package_check.values() if p])
-            services_working = len([s for s in service_results.values() if s['success']])
+            packages_installed = sum(1 for p in package_check.values() if p)
+            services_working = sum(1 for s in service_results.values() if s['success'])
             
             scenario_2_result = {
                 'scenario': 'single_optional_dependency',
@@ -365,24 +459,53 @@ except Exception as e:
         finally:
             self.cleanup_environment(temp_dir)
 
+    def _skip_scenario_3(self) -> bool:
+        """场景 2 已经证明 opendal[database] 无法安装时记录场景 3 为跳过并返回 True"""
+        scenario_2 = self.test_results.get('scenario_2')
+        database_failed = _DATABASE_INSTALL_FAILED.is_set() or (
+            scenario_2 is not None and not scenario_2.get('package_check', {}).get('opendal-database')
+        )
+        if not database_failed:
+            return False
+        
+        self.test_results['scenario_3'] = {
+            'scenario': 'multiple_optional_dependencies',
+            'skipped': True,
+            'reason': 'scenario_2 failed to install opendal-database',
+            'success': False
+        }
+        print("\n⏭️ 场景2未能安装 opendal-database，跳过场景3")
+        return True
+
     def scenario_3_multiple_optional_dependencies(self):
         """场景3: 多个可选依赖组合测试"""
         print(f"\n{'='*70}")
         print("🧪 场景3: 多个可选依赖组合测试")
         print("目标: 验证 pip install opendal[database,cloud] 功能")
         
-        temp_dir, python_path, pip_path = self.create_test_environment("multiple_optional")
+        if self._skip_scenario_3():
+            return
+        
+        temp_dir, python_path, pip_path = self.create_test_environment("multiple_optional", self._template_dir)
         
         try:
-            # 1. 安装基础包
-            self.install_base_packages(pip_path)
+            # 1. 安装基础包（从模板复制的环境中已经安装）
+            if self._template_dir is None:
+                self.install_base_packages(pip_path)
+            
+            # 与场景 2 并行运行时，场景 2 可能在此期间失败，安装前再检查一次
+            if self._skip_scenario_3():
+                return
             
             # 2. 安装多个扩展
             print(f"\n📦 安装 opendal[database,cloud]...")
             
-            # 使用可编辑模式安装多个扩展
-            install_cmd = [pip_path, "install", "-e", f"{self.base_dir}[database,cloud]"]
-            result = subprocess.run(install_cmd, capture_output=True, text=True)
+            # 使用 run_all_scenarios 中构建好的元包 wheel 安装多个扩展
+            if self.meta_wheel is None:
+                raise Exception("未能构建元包wheel")
+            
+            install_cmd = [pip_path, "install", f"{self.meta_wheel}[database,cloud]"]
+            result = run_pip(install_cmd)
             
             if result.returncode != 0:
                 raise Exception(f"安装失败: {result.stderr}")
@@ -391,20 +514,6 @@ except Exception as e:
             
             # 3. 验证安装的包
             print(f"\n🔍 验证安装的包:")
-            list_result = subprocess.run([pip_path, "list"], capture_output=True, text=True)
-            installed_list = list_result.stdout
-            
-            expected_packages = ['opendal', 'opendal-core', 'opendal-database', 'opendal-cloud']
-            package_check = {}
-            
-            for pkg in expected_packages:
-                found = pkg.replace('-', '_') in installed_list or pkg in installed_list
-                package_check[pkg] = found
-                print(f"  {pkg}: {'✅ 已安装' if found else '❌ 未安装'}")
-            
-            # 4. 测试来自不同扩展的服务
-            print(f"\n🔧 测试来自不同扩展的服务:")
-            
             mixed_services = [
                 ('redis', 'database', '配置验证'),
                 ('sled', 'database', '完整功能'),
@@ -414,72 +523,31 @@ except Exception as e:
                 ('azfile', 'advanced', '应该失败')
             ]
             
-            service_results = {}
+            # 包列表和所有服务交给同一个子进程测试
+            installed_packages, outputs = self.run_driver(python_path, "mixed",
+                                                      [[service, test_type] for service, _, test_type in mixed_services],
+                                                      temp_dir)
             
-            for service, extension_type, test_type in mixed_services:
-                print(f"\n  测试 {service} (来自{extension_type}扩展, {test_type}):")
-                
-                test_script = f'''
-import tempfile
-import os
-
-try:
-    import opendal
-    
-    # 服务配置
-    configs = {{
-        "redis": {{"endpoint": "redis://localhost:6379"}},
-        "sled": {{"datadir": tempfile.mkdtemp()}},
-        "dropbox": {{"access_token": "test_token"}},
-        "dashmap": {{}},
-        "azfile": {{"endpoint": "https://test.file.core.windows.net", "share_name": "test"}}
-    }}
-    
-    config = configs.get("{service}", {{}})
-    
-    op = opendal.Operator("{service}", **config)
-    print("✅ Operator 创建成功")
-    
-    # 对于内存类服务，尝试I/O操作
-    if "{service}" in ["sled", "dashmap"]:
-        try:
-            test_key = "scenario3_test"
-            test_data = b"Multi-extension test"
+            expected_packages = ['opendal', 'opendal-core', 'opendal-database', 'opendal-cloud']
+            # 按规范化的包名精确匹配，opendal 不会误匹配 opendal-core
+            package_check = {pkg: pkg in installed_packages for pkg in expected_packages}
             
-            op.write(test_key, test_data)
-            read_data = op.read(test_key)
+            for pkg, found in package_check.items():
+                print(f"  {pkg}: {'✅ 已安装' if found else '❌ 未安装'}")
             
-            if read_data == test_data:
-                print("✅ 完整I/O测试成功")
-            else:
-                print("❌ I/O数据不匹配")
-                
-        except Exception as io_e:
-            print(f"⚠️ I/O测试失败: {{io_e}}")
-    else:
-        print("✅ 配置验证通过")
-
-except ImportError as e:
-    if "{test_type}" == "应该失败":
-        print(f"✅ 预期的失败: {{e}}")
-    else:
-        print(f"❌ 意外的导入失败: {{e}}")
-except Exception as e:
-    if "{test_type}" == "应该失败":
-        print(f"✅ 预期的失败: {{type(e).__name__}}: {{e}}")
-    else:
-        print(f"❌ 意外错误: {{type(e).__name__}}: {{e}}")
-'''
-                
-                result = subprocess.run([python_path, "-c", test_script], 
-                                      capture_output=True, text=True)
+            # 4. 测试来自不同扩展的服务
+            print("\n🔧 测试来自不同扩展的服务:")
+            
+            service_results = {}
+            
+            for (service, extension_type, test_type), output in zip(mixed_services, outputs):
+                print(f"\n  测试 {service} (来自{extension_type}扩展, {test_type}):")
                 
-                output = result.stdout.strip()
                 
                 if test_type == "应该失败":
                     success = "预期的失败" in output
                 else:
-                    success = "✅" in output and result.returncode == 0
+                    success = "✅" in output
                 
                 service_results[service] = {
                     'extension_type': extension_type,
@@ -494,8 +562,8 @@ except Exception as e:
                             print(f"    {line}")
             
             # 5. 汇总场景3结果
-            packages_installed = len([p for p in package_check.values() if p])
-            services_working = len([s for s in service_results.values() if s['success']])
+            packages_installed = sum(1 for p in package_check.values() if p)
+            services_working = sum(1 for s in service_results.values() if s['success'])
             
             scenario_3_result = {
                 'scenario': 'multiple_optional_dependencies',
@@ -529,13 +597,58 @@ except Exception as e:
         print("🚀 OpenDAL 可选依赖三大关键场景测试")
         print("="*70)
         
-        # 运行三个场景
-        self.scenario_1_missing_dependencies()
-        self.scenario_2_single_optional_dependency()
-        self.scenario_3_multiple_optional_dependencies()
+        # 各场景使用独立的临时目录和虚拟环境，在多个进程中并行运行；
+        # 写入源码目录的安装和构建步骤由锁串行化
+        lock = multiprocessing.Lock()
+        database_install_failed = multiprocessing.Event()
+        _init_worker(lock, database_install_failed)
+        with ProcessPoolExecutor(max_workers=3, initializer=_init_worker,
+                                 initargs=(lock, database_install_failed)) as pool:
+            # 场景 1 只需要核心包，先行运行；同时在主进程中准备场景 2、3 共用的
+            # 元包 wheel 和模板环境
+            futures = [pool.submit(_run_scenario, "scenario_1_missing_dependencies", None, None)]
+            wheel_dir = tempfile.mkdtemp(prefix="opendal_meta_wheel_", dir=TEMP_ROOT)
+            cache_file = None
+            try:
+                try:
+                    self.meta_wheel = self._build_meta_wheel(wheel_dir)
+                except Exception as e:
+                    print(f"⚠️ {e}")
+                
+                # 输入没有变化的场景直接使用缓存的结果，不再创建环境
+                if self.meta_wheel is not None and RESULT_CACHE_DIR is not None:
+                    cache_file = RESULT_CACHE_DIR / f"{self._results_cache_key()}.json"
+                    for key, result in self._load_cached_results(cache_file).items():
+                        self.test_results[key] = {**result, 'cached': True}
+                        print(f"♻️ {key} 使用缓存的结果: {cache_file}")
+                pending = [name for key, name in _CACHEABLE_SCENARIOS.items() if key not in self.test_results]
+                
+                if pending:
+                    self._prepare_template_env()
+                futures += [
+                    pool.submit(_run_scenario, name, self._template_dir, self.meta_wheel)
+                    for name in pending
+                ]
+                for future in as_completed(futures):
+                    scenario_results, output = future.result()
+                    self.test_results.update(scenario_results)
+                    sys.stdout.write(output)
+                    # 每个场景完成后立即落盘，运行中途崩溃也能保留已有结果
+                    dump_json(self.test_results, self.report_file)
+                
+                if cache_file is not None:
+                    self._store_cached_results(cache_file)
+            finally:
+                if self._template_dir is not None:
+                    self.cleanup_environment(self._template_dir)
+                    self._template_dir = None
+                remove_tree_later(wheel_dir)
+        
+        # 按场景编号记录结果
+        self.test_results = dict(sorted(self.test_results.items()))
         
         # 生成最终报告
-        self.generate_final_report()
+        return self.generate_final_report()
 
     def generate_final_report(self):
         """生成最终报告"""
@@ -544,11 +657,18 @@ except Exception as e:
         print("="*70)
         
         total_scenarios = len(self.test_results)
-        successful_scenarios = len([r for r in self.test_results.values() if r.get('success', False)])
+        # Cached results were not rerun, so they are reported apart from fresh successes
+        cached_scenarios = sum(1 for r in self.test_results.values() if r.get('cached'))
+        successful_scenarios = sum(
+            1 for r in self.test_results.values()
+            if r.get('success', False) and not r.get('cached')
+        )
         
         print(f"\n📋 总体结果:")
         print(f"  测试场景: {total_scenarios}")
         print(f"  成功场景: {successful_scenarios}")
+        if cached_scenarios:
+            print(f"  缓存场景: {cached_scenarios}")
         print(f"  成功率: {successful_scenarios/total_scenarios*100:.1f}%")
         
         print(f"\n🔍 各场景详情:")
@@ -561,7 +681,10 @@ except Exception as e:
         
         for scenario_key, result in self.test_results.items():
             scenario_name = scenario_names.get(scenario_key, scenario_key)
-            status = "✅ 通过" if result.get('success', False) else "❌ 需要改进"
+            if result.get('cached'):
+                status = "♻️ 缓存 (未重新运行)"
+            else:
+                status = "✅ 通过" if result.get('success', False) else "❌ 需要改进"
             print(f"\n🔸 {scenario_name}: {status}")
             
             if 'useful_error_rate' in result:
@@ -570,17 +693,24 @@ except Exception as e:
                 print(f"   包安装率: {result['packages_success_rate']}")
             if 'services_success_rate' in result:
                 print(f"   服务功能率: {result['services_success_rate']}")
+            if result.get('skipped'):
+                print(f"   跳过: {result['reason']}")
             if 'error' in result:
                 print(f"   错误: {result['error']}")
         
         # 关键验证点
         print(f"\n🎯 关键验证结果:")
         
-        if successful_scenarios == total_scenarios:
+        # A cached result passed on a previous run with identical inputs
+        passed_scenarios = successful_scenarios + cached_scenarios
+        if cached_scenarios:
+            print(f"  ♻️ {cached_scenarios} 个场景沿用缓存结果，"
+                  "设置 OPENDAL_SCENARIO_FORCE 可重新运行")
+        if passed_scenarios == total_scenarios:
             print("  ✅ 可选依赖机制完全正常工作")
             print("  ✅ [] 语法正确处理")
             print("  ✅ 未安装依赖时有合理错误提示")
-        elif successful_scenarios >= 2:
+        elif passed_scenarios >= 2:
             print("  ✅ 可选依赖机制基本正常工作")
             print("  ⚠️ 部分场景需要改进")
         else:
@@ -588,13 +718,27 @@ except Exception as e:
             print("  ❌ 需要重新检查依赖配置")
         
         # 保存详细报告
-        report_file = Path("/Users/wang/i/opendal/bindings/python/tests/optional_dependency_scenarios_report.json")
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(self.test_results, f, indent=2, ensure_ascii=False)
+        dump_json(self.test_results, self.report_file)
+        
+        print(f"\n📄 详细报告已保存到: {self.report_file}")
         
-        print(f"\n📄 详细报告已保存到: {report_file}")
+        # 报告输出期间临时环境在后台删除，返回前等待删除完成
+        wait_for_removals()
         
-        return successful_scenarios >= 2
+        return passed_scenarios >= 2
+
+
+def _run_scenario(method_name: str, template_dir, meta_wheel) -> Tuple[Dict, str]:
+    """在工作进程中运行一个场景方法，返回 (场景结果, 输出)
+
+    输出先缓冲，由主进程统一打印，避免并行场景的输出交错
+    """
+    tester = OptionalDependencyScenarios()
+    tester._template_dir = template_dir
+    tester.meta_wheel = meta_wheel
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        getattr(tester, method_name)()
+    return tester.test_results, output.getvalue()
 
 
 if __name__ == "__main__":
@@ -10,30 +10,57 @@
 - pip install opendal[all]
 """
 
+import functools
+import json
+import os
 import subprocess
 import sys
 import tempfile
-import os
-import shutil
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from _common import (
+    REPORT_DIR,
+    TEMP_ROOT,
+    clone_venv,
+    create_venv,
+    dump_json,
+    package_wheel,
+    remove_tree_later,
+    run_pip,
+)
+
+# 元包和各服务包的发行包名
+_DISTRIBUTIONS = ("opendal", "opendal-core", "opendal-database", "opendal-cloud", "opendal-advanced")
+
+
+@functools.lru_cache(maxsize=1)
+def _discover_wheels() -> dict:
+    """一次查找全部本地构建的 wheel，返回 {发行包名: wheel 路径}
+
+    并行的各场景共用同一份结果，不再各自扫描 dist 目录。
+    """
+    return {distribution: package_wheel(distribution) for distribution in _DISTRIBUTIONS}
+
 
 class OptionalInstallationTest:
     def __init__(self):
         self.test_results = {}
-        self.original_dir = os.getcwd()
+        # 已安装核心包的基础环境目录，由 _prepare_base_env 创建
+        self._base_env_dir = None
         
-    def create_test_environment(self, env_name: str):
-        """创建一个干净的虚拟环境"""
-        print(f"\n🐍 创建测试环境: {env_name}")
+    def create_test_environment(self, env_name: str, log=print):
+        """创建一个干净的虚拟环境，有基础环境时从基础环境复制"""
+        log(f"\n🐍 创建测试环境: {env_name}")
         
         # 创建临时目录
-        temp_dir = tempfile.mkdtemp(prefix=f"opendal_test_{env_name}_")
-        os.chdir(temp_dir)
+        temp_dir = tempfile.mkdtemp(prefix=f"opendal_test_{env_name}_", dir=TEMP_ROOT)
         
-        # 创建虚拟环境
-        subprocess.run([sys.executable, "-m", "venv", "test_env"], check=True)
+        # 创建虚拟环境（从缓存的模板复制，不另外启动解释器运行 venv 和 ensurepip）
+        if self._base_env_dir is None:
+            create_venv(os.path.join(temp_dir, "test_env"))
+        else:
+            clone_venv(os.path.join(self._base_env_dir, "test_env"), os.path.join(temp_dir, "test_env"))
         
         # 获取虚拟环境的 Python 路径
         if sys.platform == "win32":
@@ -43,207 +70,123 @@ class OptionalInstallationTest:
             python_path = os.path.join(temp_dir, "test_env", "bin", "python")
             pip_path = os.path.join(temp_dir, "test_env", "bin", "pip")
         
-        print(f"📁 测试目录: {temp_dir}")
+        log(f"📁 测试目录: {temp_dir}")
         return temp_dir, python_path, pip_path
 
     def cleanup_environment(self, temp_dir: str):
         """清理测试环境"""
-        os.chdir(self.original_dir)
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        remove_tree_later(temp_dir)
 
-    def install_local_packages(self, pip_path: str, install_command: str):
-        """安装本地构建的包"""
-        print(f"📦 执行安装: {install_command}")
+    def _prepare_base_env(self):
+        """创建已安装核心包和元包的基础环境，各场景从中复制，只需安装各自扩展的服务包
+
+        元包以 --no-deps 安装，各场景的 wheel 完全相同，不必每个场景重新安装。
+        基础环境准备失败或在 Windows 上（脚本启动器内嵌路径，无法复制）时不使用基础环境，
+        各场景仍自行安装核心包和元包。
+        """
+        if sys.platform == "win32":
+            return
+        temp_dir, _, pip_path = self.create_test_environment("base")
+        available = _discover_wheels()
+        wheels = (available["opendal-core"], available["opendal"])
+        result = run_pip([pip_path, "install", "--no-compile", "--no-deps", "--no-index", *map(str, wheels)])
+        if result.returncode != 0:
+            print(f"⚠️ 基础环境准备失败，各场景单独安装核心包和元包: {result.stderr}")
+            self.cleanup_environment(temp_dir)
+            return
+        self._base_env_dir = temp_dir
+
+    def install_local_packages(self, pip_path: str, install_command: str, log=print):
+        """安装本地构建的包
+        
+        所有 wheel 交给同一次 pip 调用安装；wheel 都在本地且没有其他依赖，
+        用 --no-deps --no-index 跳过依赖解析和索引查询；探测脚本只运行一次，
+        用 --no-compile 省去为安装的文件生成 .pyc。
+        pip 的输出写入临时文件而不是终端，并行的场景之间不会交错；失败时随异常给出
+        """
+        log(f"📦 执行安装: {install_command}")
         
-        # 首先安装核心包（总是需要的）
-        core_wheel = "/Users/wang/i/opendal/bindings/python/packages/opendal-core/dist/opendal_core-0.46.0-cp311-cp311-macosx_11_0_arm64.whl"
-        subprocess.run([pip_path, "install", core_wheel], check=True)
+        available = _discover_wheels()
+        wheels = []
+        
+        # 首先安装核心包（总是需要的；从基础环境复制的环境中已经安装）
+        if self._base_env_dir is None:
+            wheels.append(available["opendal-core"])
         
         # 根据安装命令安装其他包
         if "[database]" in install_command or "[all]" in install_command:
-            db_wheel = "/Users/wang/i/opendal/bindings/python/packages/opendal-database/dist/opendal_database-0.46.0-cp311-cp311-macosx_11_0_arm64.whl"
-            subprocess.run([pip_path, "install", db_wheel], check=True)
+            wheels.append(available["opendal-database"])
             
         if "[cloud]" in install_command or "[all]" in install_command:
-            cloud_wheel = "/Users/wang/i/opendal/bindings/python/packages/opendal-cloud/dist/opendal_cloud-0.46.0-cp311-cp311-macosx_11_0_arm64.whl"
-            subprocess.run([pip_path, "install", cloud_wheel], check=True)
+            wheels.append(available["opendal-cloud"])
             
         if "[advanced]" in install_command or "[all]" in install_command:
-            advanced_wheel = "/Users/wang/i/opendal/bindings/python/packages/opendal-advanced/dist/opendal_advanced-0.46.0-cp311-cp311-macosx_11_0_arm64.whl"
-            subprocess.run([pip_path, "install", advanced_wheel], check=True)
-        
-        # 最后安装元包
-        meta_wheel = "/Users/wang/i/opendal/bindings/python/dist/opendal-0.46.0-py3-none-any.whl"
-        subprocess.run([pip_path, "install", meta_wheel], check=True)
-
-    def test_package_availability(self, python_path: str, expected_packages: list):
-        """测试包的可用性"""
-        print("🔍 测试包可用性...")
-        
-        test_script = f'''
-import sys
-import importlib
-
-results = {{}}
-
-# 测试基础导入
-try:
-    import opendal
-    results["opendal"] = "✅ 成功导入"
-except Exception as e:
-    results["opendal"] = f"❌ 导入失败: {{e}}"
-
-# 测试各个子包
-packages_to_test = {expected_packages}
-
-for pkg in packages_to_test:
-    try:
-        mod = importlib.import_module(pkg)
-        results[pkg] = "✅ 可用"
-    except ImportError:
-        results[pkg] = "❌ 不可用"
-    except Exception as e:
-        results[pkg] = f"❌ 错误: {{e}}"
-
-# 打印结果
-import json
-print(json.dumps(results))
-'''
-        
-        result = subprocess.run([python_path, "-c", test_script], 
-                              capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            try:
-                return json.loads(result.stdout.strip())
-            except:
-                return {"error": f"解析输出失败: {result.stdout}"}
-        else:
-            return {"error": f"脚本执行失败: {result.stderr}"}
-
-    def test_service_routing(self, python_path: str, test_services: list):
-        """测试服务路由"""
-        print("🧭 测试服务路由...")
+            wheels.append(available["opendal-advanced"])
         
-        test_script = f'''
-import sys
-results = {{}}
-
-try:
-    import opendal
-    
-    test_services = {test_services}
-    
-    for service_name, expected_result in test_services:
-        try:
-            op = opendal.Operator(service_name, **{{}})
-            results[service_name] = "✅ 路由成功"
-        except ImportError as e:
-            if "not installed" in str(e):
-                results[service_name] = f"⚠️ 预期的导入错误: {{e}}"
-            else:
-                results[service_name] = f"❌ 意外的导入错误: {{e}}"
-        except Exception as e:
-            # 配置错误是预期的，说明路由成功了
-            results[service_name] = f"✅ 路由成功 (配置错误正常): {{type(e).__name__}}"
-
-    import json
-    print(json.dumps(results))
-    
-except Exception as e:
-    print(json.dumps({{"error": f"路由测试失败: {{e}}"}}}))
-'''
+        # 最后安装元包（从基础环境复制的环境中已经安装）
+        if self._base_env_dir is None:
+            wheels.append(available["opendal"])
         
-        result = subprocess.run([python_path, "-c", test_script], 
-                              capture_output=True, text=True)
+        # 仅核心包的场景从基础环境复制后无需再安装
+        if not wheels:
+            return
         
-        if result.returncode == 0:
-            try:
-                return json.loads(result.stdout.strip())
-            except:
-                return {"error": f"解析输出失败: {result.stdout}"}
-        else:
-            return {"error": f"脚本执行失败: {result.stderr}"}
+        result = run_pip([pip_path, "install", "--no-compile", "--no-deps", "--no-index", *map(str, wheels)])
+        if result.returncode != 0:
+            names = ", ".join(wheel.name for wheel in wheels)
+            raise Exception(f"安装 {names} 失败: {result.stderr}")
 
-    def measure_installation_size(self, python_path: str):
-        """测量安装包大小"""
-        print("📏 测量安装大小...")
+    def _run_probe_script(self, python_path: str, expected_packages: list, test_services: list, log=print):
+        """在同一个子进程中测试包可用性、服务路由和安装大小
         
-        test_script = '''
-import sys
-import os
-from pathlib import Path
-
-def get_dir_size(path):
-    """递归计算目录大小"""
-    total_size = 0
-    try:
-        for item in Path(path).rglob('*'):
-            if item.is_file():
-                total_size += item.stat().st_size
-    except:
-        pass
-    return total_size
-
-# 获取 site-packages 路径
-import site
-site_packages = site.getsitepackages()[0]
-
-results = {}
-opendal_packages = []
-
-# 查找所有 opendal 相关包
-for item in Path(site_packages).iterdir():
-    if item.is_dir() and item.name.startswith('opendal'):
-        size = get_dir_size(item)
-        size_mb = size / (1024 * 1024)
-        results[item.name] = f"{size_mb:.2f} MB"
-        opendal_packages.append((item.name, size))
-
-# 计算总大小
-total_size = sum(size for _, size in opendal_packages)
-total_mb = total_size / (1024 * 1024)
-results["total"] = f"{total_mb:.2f} MB"
-
-import json
-print(json.dumps(results))
-'''
+        返回 {"packages": ..., "routing": ..., "size": ...}，每个场景只需启动一次解释器并导入一次 opendal；
+        输出以字节直接交给 json.loads，只在失败时才解码
+        """
+        log("🔍 测试包可用性...")
+        log("🧭 测试服务路由...")
+        log("📏 测量安装大小...")
         
-        result = subprocess.run([python_path, "-c", test_script], 
-                              capture_output=True, text=True)
+        request = {"expected_packages": expected_packages, "test_services": test_services}
+        env = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parent)}
+        result = subprocess.run([python_path, "-m", "_opendal_installation_probe", json.dumps(request)],
+                              stdin=subprocess.DEVNULL, capture_output=True, env=env)
         
         if result.returncode == 0:
             try:
-                return json.loads(result.stdout.strip())
-            except:
-                return {"error": f"解析输出失败: {result.stdout}"}
+                return json.loads(result.stdout)
+            except ValueError:
+                error = {"error": f"解析输出失败: {result.stdout.decode(errors='replace')}"}
         else:
-            return {"error": f"脚本执行失败: {result.stderr}"}
+            error = {"error": f"脚本执行失败: {result.stderr.decode(errors='replace')}"}
+        return {"packages": error, "routing": error, "size": error}
 
     def test_installation_scenario(self, scenario_name: str, install_command: str, 
                                  expected_packages: list, test_services: list):
-        """测试一个安装场景"""
-        print(f"\n{'='*60}")
-        print(f"🧪 测试场景: {scenario_name}")
-        print(f"📦 安装命令: {install_command}")
+        """测试一个安装场景，返回 (场景结果, 输出行)
+        
+        输出先缓冲在列表中，由调用方统一打印，避免并行测试时输出交错
+        """
+        lines = []
+        log = lines.append
+        
+        log(f"\n{'='*60}")
+        log(f"🧪 测试场景: {scenario_name}")
+        log(f"📦 安装命令: {install_command}")
         
-        temp_dir, python_path, pip_path = self.create_test_environment(scenario_name)
+        temp_dir, python_path, pip_path = self.create_test_environment(scenario_name, log)
         
         try:
             # 执行安装
-            self.install_local_packages(pip_path, install_command)
+            self.install_local_packages(pip_path, install_command, log)
             
-            # 测试包可用性
-            package_results = self.test_package_availability(python_path, expected_packages)
-            
-            # 测试服务路由
-            routing_results = self.test_service_routing(python_path, test_services)
-            
-            # 测量大小
-            size_results = self.measure_installation_size(python_path)
+            # 测试包可用性、服务路由和安装大小
+            probe_results = self._run_probe_script(python_path, expected_packages, test_services, log)
+            package_results = probe_results["packages"]
+            routing_results = probe_results["routing"]
+            size_results = probe_results["size"]
             
             # 保存结果
-            self.test_results[scenario_name] = {
+            scenario_result = {
                 "install_command": install_command,
                 "package_availability": package_results,
                 "service_routing": routing_results,
@@ -252,21 +195,23 @@ print(json.dumps(results))
             }
             
             # 打印结果摘要
-            print(f"\n📊 {scenario_name} 结果摘要:")
-            print(f"  包可用性: {len([k for k, v in package_results.items() if '✅' in str(v)])} / {len(package_results)}")
-            print(f"  路由测试: {len([k for k, v in routing_results.items() if '✅' in str(v)])} / {len(routing_results)}")
-            print(f"  总安装大小: {size_results.get('total', '未知')}")
+            log(f"\n📊 {scenario_name} 结果摘要:")
+            log(f"  包可用性: {sum(1 for k, v in package_results.items() if '✅' in str(v))} / {len(package_results)}")
+            log(f"  路由测试: {sum(1 for k, v in routing_results.items() if '✅' in str(v))} / {len(routing_results)}")
+            log(f"  总安装大小: {size_results.get('total', '未知')}")
             
         except Exception as e:
             error_msg = f"❌ 测试失败: {e}"
-            print(f"\n{error_msg}")
-            self.test_results[scenario_name] = {
+            log(f"\n{error_msg}")
+            scenario_result = {
                 "install_command": install_command,
                 "status": error_msg
             }
         
         finally:
             self.cleanup_environment(temp_dir)
+        
+        return scenario_result, lines
 
     def run_all_tests(self):
         """运行所有安装场景测试"""
@@ -331,14 +276,35 @@ print(json.dumps(results))
             }
         ]
         
-        # 运行每个场景
+        # 各场景使用独立的临时目录和虚拟环境，耗时主要在等待子进程，用线程并行运行；
+        # 所有场景都需要核心包和元包，先准备一次已安装两者的基础环境
+        results = {}
+        self._prepare_base_env()
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(scenarios), os.cpu_count() or 1)) as pool:
+                futures = {
+                    pool.submit(
+                        self.test_installation_scenario,
+                        scenario["name"],
+                        scenario["command"], 
+                        scenario["expected_packages"],
+                        scenario["test_services"]
+                    ): scenario["name"]
+                    for scenario in scenarios
+                }
+                
+                for future in as_completed(futures):
+                    scenario_result, lines = future.result()
+                    results[futures[future]] = scenario_result
+                    print("\n".join(lines))
+        finally:
+            if self._base_env_dir is not None:
+                self.cleanup_environment(self._base_env_dir)
+                self._base_env_dir = None
+        
+        # 按场景顺序记录结果
         for scenario in scenarios:
-            self.test_installation_scenario(
-                scenario["name"],
-                scenario["command"], 
-                scenario["expected_packages"],
-                scenario["test_services"]
-            )
+            self.test_results[scenario["name"]] = results[scenario["name"]]
         
         # 生成最终报告
         self.generate_report()
@@ -360,18 +326,17 @@ print(json.dumps(results))
                 
             if 'package_availability' in results:
                 pkg_results = results['package_availability']
-                available_count = len([k for k, v in pkg_results.items() if '✅' in str(v)])
+                available_count = sum(1 for k, v in pkg_results.items() if '✅' in str(v))
                 print(f"  包可用性: {available_count}/{len(pkg_results)}")
                 
             if 'service_routing' in results:
                 routing_results = results['service_routing']
-                routing_success = len([k for k, v in routing_results.items() if '✅' in str(v)])
+                routing_success = sum(1 for k, v in routing_results.items() if '✅' in str(v))
                 print(f"  路由成功: {routing_success}/{len(routing_results)}")
         
         # 保存详细报告
-        report_file = Path("/Users/wang/i/opendal/bindings/python/tests/optional_installation_report.json")
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(self.test_results, f, indent=2, ensure_ascii=False)
+        report_file = REPORT_DIR / "optional_installation_report.json"
+        dump_json(self.test_results, report_file)
         
         print(f"\n📄 详细报告已保存到: {report_file}")
 
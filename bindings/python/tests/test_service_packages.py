@@ -0,0 +1,30 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import sys
+
+import opendal
+
+
+def test_missing_service_package_is_not_an_attribute(monkeypatch):
+    # Simulate opendal[cloud] not being installed
+    monkeypatch.delitem(sys.modules, "opendal_cloud", raising=False)
+    monkeypatch.delattr(opendal, "opendal_cloud", raising=False)
+    monkeypatch.setitem(opendal._PKG_AVAILABLE, "opendal_cloud", False)
+
+    assert not hasattr(opendal, "opendal_cloud")
+    assert getattr(opendal, "opendal_cloud", None) is None
@@ -0,0 +1,26 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import opendal
+
+
+def test_operator_routed_to_service_package(service_name, operator, async_operator):
+    # Every service package compiles its own copy of the shared classes, so the
+    # operator types identify the package the router picked.
+    package = opendal._load_package(opendal._get_service_package(service_name))
+    assert isinstance(async_operator, package.AsyncOperator)
+    assert isinstance(operator, package.Operator)